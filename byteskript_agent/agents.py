@@ -1,7 +1,8 @@
-import json
+from functools import lru_cache
 import os
 from typing import Optional
 import autogen
+import orjson
 from autogen import register_function
 from datetime import datetime
 
@@ -12,6 +13,7 @@ from byteskript_agent.prompts import (
     CONTENT_EXTRACTOR_PROMPT,
     QUALITY_FILTER_PROMPT,
     FORMATTER_PROMPT,
+    with_current_date,
 )
 
 # Define the LLM configuration
@@ -28,63 +30,102 @@ llm_config = {
     "temperature": 0.0,
 }
 
+# Agents that call tools may emit several tool calls in one turn; the async
+# executor runs them concurrently. OpenAI rejects the flag on requests that
+# carry no tools, so it is only set for tool-calling agents.
+tool_llm_config = {
+    **llm_config,
+    "parallel_tool_calls": True,
+}
+
 
 
-def save_data_with_metadata(data: str, filename: str = "data.json") -> Optional[str]:
+def save_data_with_metadata(data: str) -> Optional[str]:
     """
-    Save data to JSON file with metadata and backup.
+    Append posts to the day's JSONL log, one post per line.
+
+    Each call only writes the new posts, and lines already written survive a
+    crash later in the run.
 
     Args:
-        data: The data to save (list of dictionaries)
-        filename: The filename to save to
+        data: The data to save (JSON array of post objects)
     """
     try:
-        # Create a timestamped filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        timestamped_filename = f"data_{timestamp}.json"
+        try:
+            posts = orjson.loads(data) if isinstance(data, (str, bytes)) else data
+        except orjson.JSONDecodeError:
+            # Keep whatever the agent sent rather than dropping it
+            posts = data
+        if not isinstance(posts, list):
+            posts = [posts]
 
-        # Save the data to the file
-        with open(timestamped_filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        log_filename = f"data_{datetime.now().strftime('%Y%m%d')}.jsonl"
+        with open(log_filename, "ab") as f:
+            for post in posts:
+                f.write(orjson.dumps(post) + b"\n")
+            f.flush()
 
-        print(f"Data saved successfully to {timestamped_filename}")
+        print(f"Appended {len(posts)} posts to {log_filename}")
 
-        return timestamped_filename
+        return log_filename
 
     except Exception as e:
         print(f"Error saving data: {e}")
         return None
 
 
+# System prompt of each agent, in the order create_agents_with_date returns them
+_AGENT_PROMPTS = (
+    SEARCH_QUERY_GENERATOR_PROMPT,
+    CONTENT_EXTRACTOR_PROMPT,
+    QUALITY_FILTER_PROMPT,
+    FORMATTER_PROMPT,
+)
+
+
 def create_agents_with_date(current_date: str):
-    """Create agents with the current date injected into their system messages."""
+    """
+    Create agents with the current date injected into their system messages.
+
+    Agents (and their registered tools) are built once per process and reused
+    across calls; each call clears their chat history and refreshes the date
+    in their system messages.
+    """
+    agents = _build_agents()
+    for agent, prompt in zip(agents, _AGENT_PROMPTS):
+        agent.reset()
+        agent.update_system_message(with_current_date(prompt, current_date))
+    return agents
 
-    # Create new agent instances with current date in system messages
+
+@lru_cache(maxsize=1)
+def _build_agents():
+    # System messages get their date in create_agents_with_date
     search_query_agent_with_date = autogen.AssistantAgent(
         name="Search_Query_Generator",
-        system_message=SEARCH_QUERY_GENERATOR_PROMPT.format(current_date=current_date),
-        llm_config=llm_config,
+        system_message=SEARCH_QUERY_GENERATOR_PROMPT,
+        llm_config=tool_llm_config,
         human_input_mode="NEVER",
     )
 
     content_extractor_agent_with_date = autogen.AssistantAgent(
         name="Content_Extractor",
-        system_message=CONTENT_EXTRACTOR_PROMPT.format(current_date=current_date),
-        llm_config=llm_config,
+        system_message=CONTENT_EXTRACTOR_PROMPT,
+        llm_config=tool_llm_config,
         human_input_mode="NEVER",
     )
 
     quality_filter_agent_with_date = autogen.AssistantAgent(
         name="Quality_Filter",
-        system_message=QUALITY_FILTER_PROMPT.format(current_date=current_date),
+        system_message=QUALITY_FILTER_PROMPT,
         llm_config=llm_config,
         human_input_mode="NEVER",
     )
 
     formatter_agent_with_date = autogen.AssistantAgent(
         name="Formatter",
-        system_message=FORMATTER_PROMPT.format(current_date=current_date),
-        llm_config=llm_config,
+        system_message=FORMATTER_PROMPT,
+        llm_config=tool_llm_config,
         human_input_mode="NEVER",
     )
 
@@ -114,7 +155,7 @@ def create_agents_with_date(current_date: str):
         save_data_with_metadata,
         caller=formatter_agent_with_date,
         executor=formatter_agent_with_date,
-        description="Save data json to a file",
+        description="Append posts (JSON array) to data_YYYYMMDD.jsonl",
     )
 
     return (
@@ -1,11 +1,93 @@
-from typing import Optional, Union, List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Union, List, Dict, Any, Tuple
 from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
+import hashlib
 import os
+import weakref
 
-from .text_drawer import BGType, Color, TextLine, TextDrawer
+import diskcache
+
+from .text_drawer import BGType, Color, Position2D, Spacing, TextLine, TextDrawer
 from .preset import Preset, ImageLayer, TextboxLayer, LayerT
 
 
+# Rendered cards kept in output_dir/.cache; the least recently stored are
+# evicted past this size
+RENDER_CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+# Image layers are fingerprinted from a copy this small instead of their full pixels
+FINGERPRINT_SIZE = (64, 64)
+
+
+@lru_cache(maxsize=64)
+def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Load a TrueType font once per (path, size)."""
+    return ImageFont.truetype(path, size)
+
+
+# id(source image) -> (weakref to the source, {(size, resample): resized copy}).
+# Entries are dropped when the source image is garbage collected.
+_RESIZE_CACHE: Dict[int, Tuple[weakref.ref, Dict[tuple, Image.Image]]] = {}
+
+
+def _resized(image: Image.Image, size: Tuple[int, int], resample: Optional[int] = None) -> Image.Image:
+    """
+    Resize an image, reusing the result when the same source is resized again.
+    
+    The returned image is shared between callers and must not be mutated.
+    """
+    key = id(image)
+    entry = _RESIZE_CACHE.get(key)
+    if entry is None or entry[0]() is not image:
+        def _evict(ref, key=key):
+            current = _RESIZE_CACHE.get(key)
+            if current is not None and current[0] is ref:
+                del _RESIZE_CACHE[key]
+        
+        entry = (weakref.ref(image, _evict), {})
+        _RESIZE_CACHE[key] = entry
+    
+    resized = entry[1].get((size, resample))
+    if resized is None:
+        resized = image.resize(size) if resample is None else image.resize(size, resample)
+        entry[1][(size, resample)] = resized
+    return resized
+
+
+def _decode_image(image: Union[Image.Image, str, bytes, os.PathLike]) -> Image.Image:
+    """
+    Decode an image layer source eagerly, once.
+    
+    Paths and raw bytes are opened, decoded and converted to RGBA so that no
+    decode work is deferred to the first paste of every render.
+    """
+    if isinstance(image, (str, bytes, os.PathLike)):
+        with Image.open(BytesIO(image) if isinstance(image, bytes) else image) as opened:
+            return opened.convert("RGBA")
+    image.load()
+    return image
+
+
+@lru_cache(maxsize=None)
+def _render_cache(cache_dir: str) -> diskcache.Cache:
+    """Open the size-bounded render cache for an output directory once."""
+    return diskcache.Cache(cache_dir, size_limit=RENDER_CACHE_SIZE_LIMIT)
+
+
+def _resolve_font(layer: TextboxLayer) -> ImageFont.FreeTypeFont:
+    """Return the layer's font, loading it through the cache if given as a path."""
+    if isinstance(layer.font, (str, os.PathLike)):
+        return _load_font(os.fspath(layer.font), layer.font_size)
+    return layer.font
+
+
+def _render_one(args: Tuple[Dict[str, Any], str, Tuple[int, int], str]) -> str:
+    """Render a single preset dictionary in a worker process."""
+    preset_dict, filename, canvas_size, output_dir = args
+    return ImgComposer.from_preset_dict(preset_dict, canvas_size, output_dir).save(filename)
+
+
 class ImgComposer:
     """
     A modular image composer for creating layered image compositions.
@@ -15,7 +97,10 @@ class ImgComposer:
     and text wrapping capabilities.
     """
     
-    def __init__(self, preset: Preset, canvas_size: tuple[int, int] = (1080, 1350), output_dir: str = "generated_templates"):
+    # Blank canvases keyed by (canvas_size, bg_color), copied for each render
+    _BG_CACHE: Dict[tuple, Image.Image] = {}
+    
+    def __init__(self, preset: Preset, canvas_size: tuple[int, int] = (1080, 1350), output_dir: str = "generated_templates", use_cache: bool = False):
         """
         Initialize the image composer with preset configuration.
         
@@ -23,16 +108,63 @@ class ImgComposer:
             preset: Preset object containing composition settings
             canvas_size: Size of the output canvas (width, height)
             output_dir: Directory to save output files
+            use_cache: Reuse previously rendered output for identical presets (off by default)
         """
         self.preset = preset
         self.canvas_size = canvas_size
         self.output_dir = output_dir
+        self.use_cache = use_cache
+        self.cache_dir = os.path.join(output_dir, ".cache")
         self._ensure_output_dir()
         self._y_cursor = 0
         
     def _ensure_output_dir(self):
         """Ensure the output directory exists."""
         os.makedirs(self.output_dir, exist_ok=True)
+
+    def _preset_fingerprint(self) -> str:
+        """
+        Hash everything that affects the rendered output.
+        
+        Returns:
+            Hex digest identifying the composition
+        """
+        digest = hashlib.sha1()
+        digest.update(repr((self.canvas_size, self.preset.bg_color)).encode())
+        
+        for layer in self.preset.layers:
+            if isinstance(layer, ImageLayer):
+                digest.update(repr((
+                    layer.type,
+                    layer.position,
+                    layer.resize_to_height,
+                    layer.resize_to_width,
+                    layer.max_width,
+                    layer.max_height,
+                    layer.auto_y_padding,
+                    layer.image.mode,
+                    layer.image.size,
+                )).encode())
+                # The downscaled copy is cached per source image, so repeated
+                # renders of the same logo or thumbnail skip its full pixels
+                digest.update(_resized(layer.image, FINGERPRINT_SIZE).tobytes())
+            elif isinstance(layer, TextboxLayer):
+                digest.update(repr((
+                    layer.type,
+                    layer.text,
+                    layer.position,
+                    getattr(_resolve_font(layer), "path", None),
+                    getattr(_resolve_font(layer), "size", None),
+                    layer.max_width,
+                    layer.text_fill,
+                    layer.bg_fill,
+                    layer.bg_type,
+                    layer.padding,
+                    layer.auto_y_padding,
+                    layer.line_spacing,
+                )).encode())
+        
+        return digest.hexdigest()
     
     def _process_image_layer(self, layer: ImageLayer, img: Image.Image) -> int:
         """
@@ -45,30 +177,32 @@ class ImgComposer:
         Returns:
             Height used by this layer
         """
-        im = layer.image.copy()
+        # The source image is only read unless thumbnail() needs to mutate it
+        im = layer.image
         pos = layer.position
         
-        # Handle resizing
+        # Handle resizing (resizes of the source image are cached across renders)
         if layer.resize_to_height:
-            im = im.resize((img.width, img.height))
+            im = _resized(layer.image, (img.width, img.height))
         elif layer.resize_to_width:
             aspect_ratio = im.width / im.height
             new_width = img.width
             new_height = int(new_width / aspect_ratio)
-            im = im.resize((new_width, new_height))
+            im = _resized(layer.image, (new_width, new_height))
         elif layer.max_width or layer.max_height:
             if layer.max_width and layer.max_height:
+                im = im.copy()
                 im.thumbnail((layer.max_width, layer.max_height))
             elif layer.max_width:
                 aspect_ratio = im.width / im.height
                 new_width = layer.max_width
                 new_height = int(new_width / aspect_ratio)
-                im = im.resize((new_width, new_height))
+                im = _resized(layer.image, (new_width, new_height))
             elif layer.max_height:
                 aspect_ratio = im.width / im.height
                 new_height = layer.max_height
                 new_width = int(new_height * aspect_ratio)
-                im = im.resize((new_width, new_height))
+                im = _resized(layer.image, (new_width, new_height))
         
         # Handle positioning
         if pos[1] == "auto":
@@ -100,14 +234,19 @@ class ImgComposer:
         # Create TextLine object
         text_line = TextLine(
             text=layer.text,
-            position=layer.position,
-            font=layer.font,
+            position=Position2D(x, y),
+            font=_resolve_font(layer),
             max_width=layer.max_width,
             line_spacing=layer.line_spacing,
             bg_fill=Color.from_tuple(layer.bg_fill) if layer.bg_fill else Color(0, 0, 0),
             text_fill=Color.from_tuple(layer.text_fill),
             bg_type=BGType(layer.bg_type),
-            padding=layer.padding
+            padding=Spacing(
+                top=layer.padding,
+                bottom=layer.padding,
+                left=layer.padding,
+                right=layer.padding,
+            )
         )
         
         # Create TextDrawer and draw
@@ -120,11 +259,27 @@ class ImgComposer:
         """
         Compose the image according to the preset configuration.
         
+        Identical presets are served from the size-bounded on-disk render cache
+        in ``output_dir/.cache`` when ``use_cache`` is enabled.
+        
         Returns:
             Composed PIL Image
         """
-        # Create base image
-        img = Image.new("RGB", self.canvas_size, color=self.preset.bg_color)
+        cache_key = None
+        if self.use_cache:
+            cache_key = self._preset_fingerprint()
+            cached = _render_cache(self.cache_dir).get(cache_key)
+            if cached is not None:
+                with Image.open(BytesIO(cached)) as image:
+                    return image.convert("RGB")
+        
+        # Create base image from a cached blank canvas
+        key = (self.canvas_size, self.preset.bg_color)
+        base = self._BG_CACHE.get(key)
+        if base is None:
+            base = Image.new("RGB", self.canvas_size, color=self.preset.bg_color)
+            self._BG_CACHE[key] = base
+        img = base.copy()
         draw = ImageDraw.Draw(img)
         
         # Reset cursor
@@ -139,6 +294,11 @@ class ImgComposer:
                 height = self._process_text_layer(layer, draw)
                 self._y_cursor += height + layer.padding
         
+        if cache_key:
+            buffer = BytesIO()
+            img.save(buffer, "PNG", optimize=False)
+            _render_cache(self.cache_dir).set(cache_key, buffer.getvalue())
+        
         return img
     
     def save(self, filename: str, format: str = "JPEG", **kwargs) -> str:
@@ -159,7 +319,7 @@ class ImgComposer:
         return filepath
     
     @classmethod
-    def from_preset_dict(cls, preset_dict: Dict[str, Any], canvas_size: tuple[int, int] = (1080, 1350), output_dir: str = "generated_templates") -> "ImgComposer":
+    def from_preset_dict(cls, preset_dict: Dict[str, Any], canvas_size: tuple[int, int] = (1080, 1350), output_dir: str = "generated_templates", use_cache: bool = False) -> "ImgComposer":
         """
         Create an ImgComposer from a preset dictionary.
         
@@ -167,6 +327,7 @@ class ImgComposer:
             preset_dict: Dictionary containing composition configuration
             canvas_size: Size of the output canvas (width, height)
             output_dir: Directory to save output files
+            use_cache: Reuse previously rendered output for identical presets (off by default)
             
         Returns:
             Configured ImgComposer instance
@@ -178,7 +339,7 @@ class ImgComposer:
             
             if layer_type == "image":
                 layer = ImageLayer(
-                    image=layer_dict["image"],
+                    image=_decode_image(layer_dict["image"]),
                     position=layer_dict["position"],
                     resize_to_height=layer_dict.get("resize_to_height", False)
                 )
@@ -189,6 +350,7 @@ class ImgComposer:
                     text=layer_dict["text"],
                     position=layer_dict["position"],
                     font=layer_dict["font"],
+                    font_size=layer_dict.get("font_size", 24),
                     max_width=layer_dict.get("max_width", 1000),
                     bg_fill=layer_dict.get("bg_fill"),
                     text_fill=layer_dict["text_fill"],
@@ -204,4 +366,33 @@ class ImgComposer:
             layers=layers
         )
         
-        return cls(preset, canvas_size, output_dir)
+        return cls(preset, canvas_size, output_dir, use_cache)
+    
+    @classmethod
+    def render_many(cls, preset_dicts: List[Dict[str, Any]], filenames: List[str], canvas_size: tuple[int, int] = (1080, 1350), output_dir: str = "generated_templates", max_workers: Optional[int] = None) -> List[str]:
+        """
+        Render and save many independent presets in parallel worker processes.
+        
+        Text layout runs in Python and holds the GIL, so cards are spread
+        across processes rather than threads. Presets must be picklable:
+        fonts loaded from a file path and PIL images both are.
+        
+        Args:
+            preset_dicts: Preset dictionaries, as accepted by from_preset_dict
+            filenames: Output filename for each preset
+            canvas_size: Size of the output canvas (width, height)
+            output_dir: Directory to save output files
+            max_workers: Number of worker processes (defaults to the CPU count)
+            
+        Returns:
+            Full paths to the saved files, in input order
+        """
+        if len(preset_dicts) != len(filenames):
+            raise ValueError("preset_dicts and filenames must have the same length")
+        
+        jobs = [
+            (preset_dict, filename, canvas_size, output_dir)
+            for preset_dict, filename in zip(preset_dicts, filenames)
+        ]
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_render_one, jobs))
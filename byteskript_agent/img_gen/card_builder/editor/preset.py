@@ -17,7 +17,7 @@ PositionT = Union[Tuple[int, int], Tuple[int, Literal["auto"]]]
 ColorTuple = Tuple[int, int, int]
 
 
-@dataclass
+@dataclass(kw_only=True)
 class ImageLayer:
     """Represents an image layer in a preset"""
 
@@ -25,16 +25,21 @@ class ImageLayer:
     image: Image.Image = field()
     position: PositionT = field()
     resize_to_height: bool = field(default=False)
+    resize_to_width: bool = field(default=False)
+    max_width: Optional[int] = field(default=None)
+    max_height: Optional[int] = field(default=None)
+    auto_y_padding: int = field(default=0)
 
 
-@dataclass
+@dataclass(kw_only=True)
 class TextboxLayer:
     """Represents a textbox layer in a preset"""
 
     type: Literal["textbox"] = "textbox"
     text: str = field()
     position: PositionT = field()
-    font: ImageFont.FreeTypeFont = field()
+    # Either a loaded font or a path to a TrueType file sized by font_size
+    font: Union[ImageFont.FreeTypeFont, str] = field()
     max_width: int = field()
     text_fill: ColorTuple = field()
     bg_fill: Optional[ColorTuple] = field(default=None)
@@ -42,6 +47,7 @@ class TextboxLayer:
     padding: int = field(default=0)
     auto_y_padding: int = field(default=0)
     line_spacing: int = field(default=5)
+    font_size: int = field(default=24)
 
 
 LayerT = Union[ImageLayer, TextboxLayer]
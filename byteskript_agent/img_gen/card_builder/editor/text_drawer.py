@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 from PIL import ImageFont, ImageDraw, Image
 import textwrap
 
@@ -21,6 +22,9 @@ class Color:
     r: int
     g: int
     b: int
+    # Precomputed forms used as PIL fills, so draw calls don't reformat them
+    rgb: tuple[int, int, int] = field(init=False, repr=False, compare=False)
+    _hex: str = field(init=False, repr=False, compare=False)
 
     @classmethod
     def from_tuple(cls, color_tuple: tuple[int, int, int]) -> "Color":
@@ -36,10 +40,12 @@ class Color:
             or self.b > 255
         ):
             raise ValueError("Color values must be between 0 and 255")
+        self.rgb = (self.r, self.g, self.b)
+        self._hex = f"#{self.r:02x}{self.g:02x}{self.b:02x}"
 
     @property
     def hex(self) -> str:
-        return f"#{self.r:02x}{self.g:02x}{self.b:02x}"
+        return self._hex
 
 
 @dataclass
@@ -82,6 +88,67 @@ class TextLine:
         if self.line_height < 0:
             raise ValueError("Line height must be non-negative")
 
+@lru_cache(maxsize=4096)
+def _text_size(text: str, font: ImageFont.FreeTypeFont) -> tuple[int, int]:
+    """Measure text with font.getbbox, memoized per (text, font).
+
+    Fonts hash by identity, and the cache holds a reference to each font, so a
+    key can never be reused by a different font object.
+    """
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+@lru_cache(maxsize=8192)
+def _word_width(word: str, font: ImageFont.FreeTypeFont) -> float:
+    """Horizontal advance of a single word, memoized per (word, font)."""
+    return font.getlength(word)
+
+
+def _wrap_words(
+    text: str, font: ImageFont.FreeTypeFont, max_width: int
+) -> list[str]:
+    """Greedily wrap text into lines no wider than max_width."""
+    words = text.split()
+    if not words:
+        return []
+
+    # Measure each word once and accumulate advances, instead of
+    # re-measuring the whole candidate line for every word added.
+    word_widths = [_word_width(word, font) for word in words]
+    space_width = _word_width(" ", font)
+
+    lines = []
+    line_words = [words[0]]
+    line_width = word_widths[0]
+
+    for word, word_width in zip(words[1:], word_widths[1:]):
+        if line_width + space_width + word_width <= max_width:
+            line_words.append(word)
+            line_width += space_width + word_width
+        else:
+            lines.append(" ".join(line_words))
+            line_words = [word]
+            line_width = word_width
+
+    lines.append(" ".join(line_words))
+    return lines
+
+
+@lru_cache(maxsize=256)
+def _layout(
+    text: str, font: ImageFont.FreeTypeFont, max_width: int
+) -> tuple[tuple[str, int, int], ...]:
+    """Wrapped lines with their (width, height), memoized per textbox.
+
+    Recurring textboxes (source lines, repeated titles) skip both wrapping and
+    measurement on later renders.
+    """
+    return tuple(
+        (line, *_text_size(line, font)) for line in _wrap_words(text, font, max_width)
+    )
+
+
 class TextDrawer:
     def __init__(
         self,
@@ -89,12 +156,11 @@ class TextDrawer:
     ):
         self.line = line
 
-    def _get_text_size(self, text: str, font: ImageFont.FreeTypeFont) -> Size2D:
-        """Get the width and height of text."""
-        bbox = font.getbbox(text)
-        width = bbox[2] - bbox[0]
-        height = bbox[3] - bbox[1]
-        return Size2D(width=width, height=height)
+    def _get_text_size(
+        self, text: str, font: ImageFont.FreeTypeFont
+    ) -> tuple[int, int]:
+        """Get the (width, height) of text."""
+        return _text_size(text, font)
 
     def _get_line_height(self, font: ImageFont.FreeTypeFont) -> float:
         """Get the recommended line height for the font."""
@@ -108,24 +174,7 @@ class TextDrawer:
         self, text: str, font: ImageFont.FreeTypeFont, max_width: int
     ) -> list[str]:
         """Wrap text to fit within max_width."""
-        words = text.split()
-        lines = []
-        line = ""
-
-        for word in words:
-            test_line = f"{line} {word}".strip()
-            line_size = self._get_text_size(test_line, font)
-            if line_size.width <= max_width:
-                line = test_line
-            else:
-                if line:
-                    lines.append(line)
-                line = word
-
-        if line:
-            lines.append(line)
-
-        return lines
+        return _wrap_words(text, font, max_width)
 
     def _draw_line_bg(
         self,
@@ -135,54 +184,53 @@ class TextDrawer:
         start_y: int,
         line_width: float,
         line_height: float,
-    ) -> Size2D:
+    ) -> tuple[float, float]:
+        """Draw the background box for one line and return its (width, height)."""
         bg_x0 = start_x - line.padding.left
         bg_y0 = start_y - line.padding.top
         bg_x1 = start_x + line_width + line.padding.right
         bg_y1 = start_y + line_height + line.padding.bottom
-        draw.rectangle((bg_x0, bg_y0, bg_x1, bg_y1), fill=line.bg_fill.hex)
-        return Size2D(width=bg_x1 - bg_x0, height=bg_y1 - bg_y0)
+        draw.rectangle((bg_x0, bg_y0, bg_x1, bg_y1), fill=line.bg_fill.rgb)
+        return bg_x1 - bg_x0, bg_y1 - bg_y0
 
     def _draw_text(
         self, draw: ImageDraw, line: TextLine, start_x: int, start_y: int, wrapped_line: str
     ):
         draw.text(
-            (start_x, start_y), wrapped_line, font=line.font, fill=line.text_fill.hex
+            (start_x, start_y), wrapped_line, font=line.font, fill=line.text_fill.rgb
         )
 
     def _draw_wrapped_text(
         self,
         draw: ImageDraw,
         line: TextLine,
-    ) -> int:
-        """Draw wrapped text and return the total height used."""
-        wrapped_lines = self._wrap_text(line.text, line.font, line.max_width)
+    ) -> Size2D:
+        """Draw wrapped text and return the total size used."""
+        wrapped_lines = _layout(line.text, line.font, line.max_width)
         line_height = self._get_line_height(line.font)
         total_height = 0
+        # Plain numbers inside the loop; Size2D is only built for the caller
+        x = line.position.x
         current_y = line.position.y
+        has_bg = line.bg_type != BGType.NONE
 
-        for i, wrapped_line in enumerate(wrapped_lines):
-            line_size = self._get_text_size(wrapped_line, line.font)
+        for i, (wrapped_line, line_width, line_text_height) in enumerate(wrapped_lines):
             current_text_y = current_y + total_height
 
-            if line.bg_type != BGType.NONE:
-                bg_size = self._draw_line_bg(
+            if has_bg:
+                _, bg_height = self._draw_line_bg(
                     draw,
                     line,
-                    line.position.x,
+                    x,
                     current_text_y,
-                    line_size.width,
+                    line_width,
                     line_height,
                 )
 
-            self._draw_text(draw, line, line.position.x, current_text_y, wrapped_line)
+            self._draw_text(draw, line, x, current_text_y, wrapped_line)
 
             # Add the actual background height for this line
-            total_height += (
-                bg_size.height
-                if line.bg_type != BGType.NONE
-                else line_size.height
-            )
+            total_height += bg_height if has_bg else line_text_height
 
             # Add spacing between lines (but not after the last line)
             if i < len(wrapped_lines) - 1:
@@ -1,4 +1,5 @@
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 import os
 
 from byteskript_agent.img_gen.card_builder.editor.text_drawer import (
@@ -10,6 +11,24 @@ from byteskript_agent.img_gen.card_builder.editor.text_drawer import (
     TextDrawer,
 )
 
+# Textbox padding is the same for every layer, so one instance is shared
+_DEFAULT_PADDING = Spacing(top=10, bottom=10, left=10, right=10)
+_DEFAULT_BG_FILL = Color(0, 0, 0)
+
+
+def _has_transparency(im: Image.Image) -> bool:
+    """Whether pasting im needs its alpha as a mask.
+
+    A masked paste blends every pixel and costs ~10x a plain copy; generated
+    thumbnails are RGBA but fully opaque, so they can be copied directly.
+    """
+    return im.mode == "RGBA" and im.getchannel("A").getextrema()[0] < 255
+
+
+def _as_color(value) -> Color:
+    """Accept either a prebuilt Color or an (r, g, b) tuple from a preset."""
+    return value if isinstance(value, Color) else Color.from_tuple(value)
+
 
 class ImageGenerator:
     def __init__(
@@ -33,20 +52,16 @@ class ImageGenerator:
             new image with black fade applied
         """
         w, h = img.size
-        fade = Image.new("L", (w, height), color=0)
-
-        print(f"Adding black fade of height {height}")
 
-        for y in range(height):
-            opacity = int(255 * (y / height))  # more opaque at bottom
-            ImageDraw.Draw(fade).line(
-                [(0, height - y - 1), (w, height - y - 1)], fill=255 - opacity
-            )
+        # Build the whole alpha mask at once. Row r (from the top) has opacity
+        # 255 - 255 * (height - 1 - r) // height, fully opaque on the bottom row.
+        steps = np.arange(height - 1, -1, -1, dtype=np.int32)
+        ramp = (255 - (255 * steps) // height).astype(np.uint8)
+        alpha = np.ascontiguousarray(np.broadcast_to(ramp[:, None], (height, w)))
+        fade = Image.fromarray(alpha)  # 2-D uint8 -> mode "L"
 
-        black_layer = Image.new("RGBA", (w, height), color=(0, 0, 0, 0))
-        black_layer.putalpha(fade)
-
-        img.paste(black_layer, (0, h - height), black_layer)
+        # Blend solid black straight through the mask; no intermediate RGBA layer
+        img.paste((0, 0, 0), (0, h - height, w, h), fade)
         return img
 
     def generate_image(self, preset) -> Image.Image:
@@ -100,11 +115,15 @@ class ImageGenerator:
                     pos = (pos[0], img.height - im.height)
 
                 if layer.get("crop_center_scale", False):
-                    # Crop the image to the center and scale it to the canvas size
-                    im = im.crop((0, 0, im.width, im.height))
-                    im = im.resize((img.width, img.height), Image.Resampling.LANCZOS)
+                    # Scale the image to the canvas size. BICUBIC is indistinguishable
+                    # from LANCZOS for the upscaled thumbnails and much cheaper; large
+                    # sources are box-reduced close to the target before resampling.
+                    resample = layer.get("resample", Image.Resampling.BICUBIC)
+                    im = im.resize(
+                        (img.width, img.height), resample, reducing_gap=3.0
+                    )
 
-                img.paste(im, pos, im if im.mode == "RGBA" else None)
+                img.paste(im, pos, im if _has_transparency(im) else None)
                 pos = (pos[0], pos[1] + (im.height - img.height))
 
             elif layer_type == "black_fade":
@@ -118,7 +137,7 @@ class ImageGenerator:
                 if y == "auto":
                     y = y_cursor + layer.get("auto_y_padding", 0)
 
-                bg_fill = layer.get("bg_fill", (0, 0, 0))
+                bg_fill = layer.get("bg_fill", _DEFAULT_BG_FILL)
                 bg_type = BGType(layer.get("bg_type", "none"))
                 padding = layer.get("padding", 0)
 
@@ -130,15 +149,10 @@ class ImageGenerator:
                             font=fonts[layer["font"]],
                             max_width=layer["max_width"],
                             line_spacing=layer.get("line_spacing", 5),
-                            bg_fill=Color.from_tuple(bg_fill),
-                            text_fill=Color.from_tuple(layer["text_fill"]),
+                            bg_fill=_as_color(bg_fill),
+                            text_fill=_as_color(layer["text_fill"]),
                             bg_type=bg_type,
-                            padding=Spacing(
-                                top=10,
-                                bottom=10,
-                                left=10,
-                                right=10,
-                            ),
+                            padding=layer.get("padding_obj", _DEFAULT_PADDING),
                         )
                     )
                     .draw(draw)
@@ -1,29 +1,62 @@
+import asyncio
+import inspect
 import json
+import logging
 import os
 from datetime import datetime
-import traceback
+from functools import lru_cache
 from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
 from io import BytesIO
 from PIL import ImageFont
 import replicate
 
-from byteskript_agent.img_gen.openai_img import get_openai_image
+from byteskript_agent.img_gen.card_builder.editor.text_drawer import Color
+from byteskript_agent.img_gen.openai_img import get_openai_image, get_openai_image_async
 
+log = logging.getLogger(__name__)
 
-def get_logo():
+# Image generation is dominated by OpenAI API latency, so several items run at once
+MAX_CONCURRENT_ITEMS = 4
+
+# Shared session so image downloads reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+
+@lru_cache(maxsize=32)
+def _font(path, size):
+    """Parse a font file once per (path, size) for the whole batch."""
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=1)
+def _load_logo():
     im = Image.open("assets/bs_logo_dark.png")
     im.thumbnail((100, 100))
     return im
 
 
+def get_logo():
+    # Hand out a copy so callers can't mutate the cached logo
+    return _load_logo().copy()
+
+
+# Colors are built once rather than per item and per draw
+TITLE_BG_FILL = Color.from_tuple((0, 71, 171))
+TITLE_TEXT_FILL = Color.from_tuple((255, 255, 255))
+SOURCE_TEXT_FILL = Color.from_tuple((200, 200, 200))
+
+
 # Example preset configuration
 def generate_preset(title_text, source_text, image):
     return {
         "bg_color": (244, 244, 244),
         "fonts": {
-            "title": ImageFont.truetype("assets/OpenSauceTwo-Bold.ttf", 48),
-            "small": ImageFont.truetype("assets/OpenSauceTwo-Regular.ttf", 24),
+            "title": _font("assets/OpenSauceTwo-Bold.ttf", 48),
+            "small": _font("assets/OpenSauceTwo-Regular.ttf", 24),
         },
         "layers": [
             {
@@ -32,8 +65,8 @@ def generate_preset(title_text, source_text, image):
                 "text": title_text,  # This will be replaced with title_text
                 "position": (80, 100),
                 "max_width": 920,
-                "bg_fill": (0, 71, 171),
-                "text_fill": (255, 255, 255),
+                "bg_fill": TITLE_BG_FILL,
+                "text_fill": TITLE_TEXT_FILL,
                 "padding": 10,
                 "bg_type": "solid",
             },
@@ -43,7 +76,7 @@ def generate_preset(title_text, source_text, image):
                 "text": source_text,  # This will be replaced with source_text
                 "position": (70, "auto"),
                 "max_width": 960,
-                "text_fill": (200, 200, 200),
+                "text_fill": SOURCE_TEXT_FILL,
                 "auto_y_padding": 10,
                 "bg_type": "none",
             },
@@ -92,24 +125,39 @@ class NewsDataProcessor:
             PIL.Image: Downloaded image or a placeholder if download fails
         """
         try:
-            response = requests.get(url, timeout=10)
+            response = _SESSION.get(url, timeout=10, stream=True)
             response.raise_for_status()
 
-            # Open image from bytes
-            image = Image.open(BytesIO(response.content))
+            # Decode straight from the response stream
+            response.raw.decode_content = True
+            image = Image.open(response.raw)
 
-            # Convert to RGBA if necessary
-            if image.mode != "RGBA":
-                image = image.convert("RGBA")
+            # Let JPEGs decode straight to a reduced DCT scale (no-op for other
+            # formats); thumbnail() below still does the exact final resize
+            image.draft("RGB", max_size)
+
+            # Palette images can only be resized with NEAREST, so convert them
+            # first; only transparent ones need the extra alpha channel
+            if image.mode in ("1", "P"):
+                image = image.convert(
+                    "RGBA" if "transparency" in image.info else "RGB"
+                )
 
             # Resize if larger than max_size while maintaining aspect ratio
             if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
                 image.thumbnail(max_size, Image.Resampling.LANCZOS)
 
+            # Opaque images stay RGB; paste() needs no mask for them. Anything
+            # else with alpha becomes RGBA, after resizing so it runs on fewer pixels
+            if image.mode in ("LA", "PA", "La", "RGBa"):
+                image = image.convert("RGBA")
+            elif image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGB")
+
             return image
 
         except Exception as e:
-            print(f"Failed to download image from {url}: {e}")
+            log.warning("Failed to download image from %s: %s", url, e)
             # Return a placeholder image
             placeholder = Image.new("RGBA", max_size, (200, 200, 200))
             draw = Image.Draw(placeholder)
@@ -118,14 +166,25 @@ class NewsDataProcessor:
 
     def generate_image_with_openai(self, title, source_text):
         img_bytes = get_openai_image(title, source_text)
+        return self._open_openai_image(title, img_bytes)
+
+    async def generate_image_with_openai_async(self, title, source_text):
+        img_bytes = await get_openai_image_async(title, source_text)
+        return await asyncio.to_thread(self._open_openai_image, title, img_bytes)
+
+    def _open_openai_image(self, title, img_bytes):
+        # Decoding is deferred to the first paste unless the debug copy is written
         im = Image.open(BytesIO(img_bytes))
-        im.save(f"output_openai_{title}.png")
+        if os.environ.get("BYTESKRIPT_DEBUG"):
+            im.load()
+            im.save(f"output_openai_{title}.png")
         return im
 
     def generate_image_with_replicate(self, title, source_text, image: Image.Image):
-        # Convert PIL Image to bytes and create BytesIO object
+        # Convert PIL Image to bytes and create BytesIO object. Lossless WebP at
+        # method 0 keeps alpha and skips PNG's much slower DEFLATE pass.
         img_byte_arr = BytesIO()
-        image.save(img_byte_arr, format="PNG")
+        image.save(img_byte_arr, format="WEBP", lossless=True, method=0)
         img_byte_arr.seek(0)
 
         output = replicate.run(
@@ -143,8 +202,9 @@ class NewsDataProcessor:
         if isinstance(output, str):
             # If it's a URL, download it
             if output.startswith("http"):
-                response = requests.get(output)
-                im = Image.open(BytesIO(response.content))
+                response = _SESSION.get(output, stream=True)
+                response.raw.decode_content = True
+                im = Image.open(response.raw)
             else:
                 # If it's a file path, open it directly
                 im = Image.open(output)
@@ -154,53 +214,77 @@ class NewsDataProcessor:
         else:
             # If it's already bytes or BytesIO
             im = Image.open(BytesIO(output))
-        im.save("output.png")
-        print(im.size)
+        # Decode now; the source stream may not outlive this call
+        im.load()
+        if os.environ.get("BYTESKRIPT_DEBUG"):
+            im.save("output.png")
+        log.debug("Replicate output size: %s", im.size)
         return im
 
     async def process_data(self, data: list) -> list[Image.Image]:
         """
         Process JSON data containing news items and generate images for each.
 
+        Up to MAX_CONCURRENT_ITEMS images are generated at once; on_one_generated
+        runs as soon as each image is ready, outside that limit, and may be a
+        plain function or a coroutine function.
+
         Args:
-            json_file_path (str): Path to the JSON file containing news data
-            output_prefix (str): Prefix for output filenames
+            data (list): News items to generate images for
 
         Returns:
-            list: List of generated image paths
+            list: Generated images, in the order of the input items
         """
-        generated_images = []
-        for i, news_item in enumerate(data):
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ITEMS)
+        # Results are stored by index so the output keeps the input order
+        results: list = [None] * len(data)
+
+        async def generate_one(i: int, news_item: dict) -> Image.Image:
+            # Extract data from news item
+            title = news_item.get("title", "No Title")
+            source = news_item.get("source", "Unknown Source")
+            summary = news_item.get("summary", "No Summary Found")
+            custom_img = news_item.get("custom_img", None)
+
+            # Create source text with current date
+            source_text = f"Source: {source} | {news_item.get('publish_date', datetime.now().strftime('%d %B %Y'))} | Photo: Generated"
+
+            if custom_img:
+                image = custom_img
+            else:
+                # Prompt and image requests chain per item, so one item's
+                # image call overlaps with other items' prompt calls
+                image = await self.generate_image_with_openai_async(title, summary)
+
+            # Generate the image
+            log.debug("Generating image %d/%d: %s...", i + 1, len(data), title[:50])
+            return await asyncio.to_thread(
+                self.image_generator.generate_image,
+                preset=generate_preset(title, source_text, image),
+            )
+
+        async def process_one(i: int, news_item: dict):
             try:
-                # Extract data from news item
-                title = news_item.get("title", "No Title")
-                source = news_item.get("source", "Unknown Source")
-                summary = news_item.get("summary", "No Summary Found")
-                custom_img = news_item.get("custom_img", None)
-
-                # Create source text with current date
-                source_text = f"Source: {source} | {news_item.get('publish_date', datetime.now().strftime('%d %B %Y'))} | Photo: Generated"
-
-                if custom_img:
-                    image = custom_img
-                else:
-                    image = self.generate_image_with_openai(title, summary)
-
-                # Generate the image
-                print(f"Generating image {i + 1}/{len(data)}: {title[:50]}...")
-                img: Image.Image = self.image_generator.generate_image(
-                    preset=generate_preset(title, source_text, image),
-                )
-
-                generated_images.append(img)
-                await self.on_one_generated(img, news_item)
+                async with semaphore:
+                    img = await generate_one(i, news_item)
+                results[i] = img
+                # The slot is released before the callback, so uploading this
+                # item overlaps with generating the next one
+                callback_result = self.on_one_generated(img, news_item)
+                if inspect.isawaitable(callback_result):
+                    await callback_result
             except Exception as e:
-                traceback.print_exc()
-                print(f"Failed to process news item {i + 1}: {e}")
-                continue
+                log.exception("Failed to process news item %d: %s", i + 1, e)
+
+        await asyncio.gather(
+            *(process_one(i, news_item) for i, news_item in enumerate(data))
+        )
+        generated_images = [img for img in results if img is not None]
 
-        print(
-            f"Successfully generated {len(generated_images)} images from {len(data)} news items"
+        log.info(
+            "Successfully generated %d images from %d news items",
+            len(generated_images),
+            len(data),
         )
         return generated_images
 
@@ -1,6 +1,14 @@
+import asyncio
 from base64 import b64decode
+import logging
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+log = logging.getLogger(__name__)
+
+_CLIENT = None
+_ASYNC_CLIENT = None
+_ASYNC_CLIENT_LOOP = None
 
 
 IMAGE_PROMPT = """
@@ -14,8 +22,8 @@ Follow this theme context to guide the visual tone:
 <theme>{theme}</theme>
 """
 
-def generate_openai_image_prompt(title: str, summary: str) -> str:
-    prompt = """
+
+THUMBNAIL_PROMPT = """
 You are a thumbnail image prompt generator for a tech meme-style news platform.
 
 Your goal is to create a **funny**, **minimalistic**, and **realistic** image that represents the news below. It should feel like a meme thumbnail — clever or ironic — but look like a real photograph.
@@ -35,24 +43,54 @@ Only return the exact image generation prompt, nothing else.
 
 News Title: {title}
 News Summary: {summary}
-    """.strip()
+""".strip()
+
+DESIGNER_SYSTEM_MESSAGE = "You are an AI visual designer for ByteSkript with 10+ years of experience in visual design."
+
+
+def _client() -> OpenAI:
+    """Shared OpenAI client, so sequential calls reuse keep-alive connections."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _CLIENT
+
 
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+def _async_client() -> AsyncOpenAI:
+    """Shared AsyncOpenAI client, so concurrent requests reuse one connection pool.
+
+    The client's pool is bound to the event loop it first ran on, so a new one
+    is created if called from a different loop.
+    """
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT_LOOP is not loop:
+        _ASYNC_CLIENT = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        _ASYNC_CLIENT_LOOP = loop
+    return _ASYNC_CLIENT
+
+
+def _image_prompt_messages(title: str, summary: str) -> list[dict]:
+    return [
+        {"role": "system", "content": DESIGNER_SYSTEM_MESSAGE},
+        {"role": "user", "content": THUMBNAIL_PROMPT.format(title=title, summary=summary)}
+    ]
+
+
+def generate_openai_image_prompt(title: str, summary: str) -> str:
+    client = _client()
     response = client.chat.completions.create(
         model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are an AI visual designer for ByteSkript with 10+ years of experience in visual design."},
-            {"role": "user", "content": prompt.format(title=title, summary=summary)}
-        ]
+        messages=_image_prompt_messages(title, summary),
     )
 
     content = response.choices[0].message.content
-    print(content)
+    log.debug("Image prompt: %s", content)
     return content
 
 def get_openai_image(title: str, summary: str) -> bytes:
     """Process image using OpenAI API and return processed image bytes"""
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    client = _client()
     img_response = client.images.generate(
         prompt=generate_openai_image_prompt(title, summary),
         model="gpt-image-1",
@@ -62,3 +100,27 @@ def get_openai_image(title: str, summary: str) -> bytes:
         background="auto",
     )
     return b64decode(img_response.data[0].b64_json)
+
+
+async def generate_openai_image_prompt_async(title: str, summary: str) -> str:
+    response = await _async_client().chat.completions.create(
+        model="gpt-4o",
+        messages=_image_prompt_messages(title, summary),
+    )
+
+    content = response.choices[0].message.content
+    log.debug("Image prompt: %s", content)
+    return content
+
+
+async def get_openai_image_async(title: str, summary: str) -> bytes:
+    """Async variant of get_openai_image, for generating a batch concurrently"""
+    img_response = await _async_client().images.generate(
+        prompt=await generate_openai_image_prompt_async(title, summary),
+        model="gpt-image-1",
+        n=1,
+        size="1024x1024",
+        quality="medium",
+        background="auto",
+    )
+    return b64decode(img_response.data[0].b64_json)
@@ -1,10 +1,26 @@
 from abc import ABC, abstractmethod
+import asyncio
 from dataclasses import dataclass, field
+import functools
+import hashlib
+import json
 from typing import Optional, Dict, Any
 import os
 
+import diskcache
+import httpx
+import tenacity
 
-@dataclass
+LLM_CACHE_TTL_SECONDS = 6 * 3600
+LLM_MAX_ATTEMPTS = 4
+
+# Persistent across runs, so re-running the pipeline doesn't re-hit the LLM
+# with prompts it has already answered
+_LLM_CACHE = diskcache.Cache("./.llm_cache")
+LLM_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+@dataclass(slots=True)
 class LLMConfig:
     """Configuration for LLM providers"""
 
@@ -15,12 +31,107 @@ class LLMConfig:
     additional_params: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Prompt:
     user_message: str
     system_message: Optional[str] = field(default=None)
 
 
+def _llm_cache_key(provider: "LLMProvider", prompt) -> str:
+    """Key a generation by provider, model parameters and the full prompt."""
+    if isinstance(prompt, Prompt):
+        system_message, user_message = prompt.system_message, prompt.user_message
+    else:
+        system_message, user_message = None, prompt
+    config = provider.config
+    raw = json.dumps(
+        [
+            type(provider).__name__,
+            config.model,
+            config.temperature,
+            config.max_tokens,
+            config.additional_params,
+            system_message,
+            user_message,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_generation(generate):
+    """Memoize a provider's generate() on disk when its output is deterministic.
+
+    Only temperature 0 generations are cached; sampling at higher temperatures
+    is expected to vary between calls.
+    """
+
+    @functools.wraps(generate)
+    def wrapper(self: "LLMProvider", prompt):
+        if self.config.temperature > 0:
+            return generate(self, prompt)
+
+        key = _llm_cache_key(self, prompt)
+        cached = _LLM_CACHE.get(key)
+        if cached is not None:
+            LLM_CACHE_STATS["hits"] += 1
+            return cached
+
+        LLM_CACHE_STATS["misses"] += 1
+        response = generate(self, prompt)
+        if response:
+            _LLM_CACHE.set(key, response, expire=LLM_CACHE_TTL_SECONDS)
+        return response
+
+    return wrapper
+
+
+class LLMGenerationError(Exception):
+    """Raised when a generation still fails after all retries."""
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Rate limits, server errors and dropped connections are worth retrying."""
+    # openai/anthropic expose status_code, google-genai exposes code
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # google-genai surfaces httpx's ConnectError/ReadTimeout directly
+    if isinstance(exc, (ConnectionError, TimeoutError, httpx.TransportError)):
+        return True
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_transient(generate):
+    """Retry a provider's generate() on transient API failures.
+
+    Attempts back off exponentially with jitter, so concurrent batches that hit
+    a rate limit together don't retry in lockstep. Once attempts run out the
+    last transient error is raised as LLMGenerationError; any other error
+    (bad key, invalid request, bugs) propagates unchanged.
+    """
+    retrying = tenacity.retry(
+        stop=tenacity.stop_after_attempt(LLM_MAX_ATTEMPTS),
+        wait=tenacity.wait_exponential_jitter(initial=1, max=8),
+        retry=tenacity.retry_if_exception(_is_transient),
+        reraise=True,
+    )(generate)
+
+    @functools.wraps(generate)
+    def wrapper(self: "LLMProvider", prompt):
+        try:
+            return retrying(self, prompt)
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+            raise LLMGenerationError(
+                f"{type(self).__name__} generation failed: {e}"
+            ) from e
+
+    return wrapper
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
 
@@ -38,6 +149,14 @@ class LLMProvider(ABC):
         """Generate text from prompt"""
         pass
 
+    async def agenerate(self, prompt: Prompt) -> str:
+        """Generate text without blocking the event loop.
+
+        The SDK calls are blocking network I/O, so they run in a worker thread
+        and several prompts can be in flight at once.
+        """
+        return await asyncio.to_thread(self.generate, prompt)
+
     @property
     def client(self):
         """Lazy initialization of client"""
@@ -54,6 +173,8 @@ class OpenAIProvider(LLMProvider):
 
         self._client = OpenAI(api_key=self.config.api_key)
 
+    @cached_generation
+    @retry_transient
     def generate(self, prompt: str) -> str:
         response = self.client.chat.completions.create(
             model=self.config.model,
@@ -73,6 +194,8 @@ class AnthropicProvider(LLMProvider):
 
         self._client = anthropic.Anthropic(api_key=self.config.api_key)
 
+    @cached_generation
+    @retry_transient
     def generate(self, prompt: str) -> str:
         response = self.client.messages.create(
             model=self.config.model,
@@ -87,17 +210,15 @@ class AnthropicProvider(LLMProvider):
 class GoogleProvider(LLMProvider):
     """Google Gemini provider"""
 
-    def __init__(self, config: LLMConfig):
-        super().__init__(config)
-        self._initialize_client()
-
     def _initialize_client(self):
         from google import genai
 
         self._client = genai.Client(api_key=self.config.api_key)
 
+    @cached_generation
+    @retry_transient
     def generate(self, prompt: Prompt) -> str:
-        response = self._client.models.generate_content(
+        response = self.client.models.generate_content(
             model=self.config.model,
             contents=prompt.user_message,
             config={
@@ -118,6 +239,8 @@ class CohereProvider(LLMProvider):
 
         self._client = cohere.Client(api_key=self.config.api_key)
 
+    @cached_generation
+    @retry_transient
     def generate(self, prompt: str) -> str:
         response = self.client.generate(
             model=self.config.model,
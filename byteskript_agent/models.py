@@ -1,144 +1,22 @@
-from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-import json
 from typing import List, Optional, Dict, Any
-import os
 
+import orjson
 
-@dataclass
-class LLMConfig:
-    """Configuration for LLM providers"""
+# Provider classes live in llm_providers; re-exported for existing imports
+from byteskript_agent.llm_providers import (  # noqa: F401
+    LLMConfig,
+    LLMProvider,
+    OpenAIProvider,
+    AnthropicProvider,
+    GoogleProvider,
+    CohereProvider,
+    create_llm_provider,
+)
 
-    api_key: str
-    model: str
-    temperature: float = 0.0
-    max_tokens: Optional[int] = None
-    additional_params: Optional[Dict[str, Any]] = None
 
-
-class LLMProvider(ABC):
-    """Abstract base class for LLM providers"""
-
-    def __init__(self, config: LLMConfig):
-        self.config = config
-        self._client = None
-
-    @abstractmethod
-    def _initialize_client(self):
-        """Initialize the LLM client"""
-        pass
-
-    @abstractmethod
-    def generate(self, prompt: str) -> str:
-        """Generate text from prompt"""
-        pass
-
-    @property
-    def client(self):
-        """Lazy initialization of client"""
-        if self._client is None:
-            self._initialize_client()
-        return self._client
-
-
-class OpenAIProvider(LLMProvider):
-    """OpenAI GPT provider"""
-
-    def _initialize_client(self):
-        from openai import OpenAI
-
-        self._client = OpenAI(api_key=self.config.api_key)
-
-    def generate(self, prompt: str) -> str:
-        response = self.client.chat.completions.create(
-            model=self.config.model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
-            **(self.config.additional_params or {}),
-        )
-        return response.choices[0].message.content
-
-
-class AnthropicProvider(LLMProvider):
-    """Anthropic Claude provider"""
-
-    def _initialize_client(self):
-        import anthropic
-
-        self._client = anthropic.Anthropic(api_key=self.config.api_key)
-
-    def generate(self, prompt: str) -> str:
-        response = self.client.messages.create(
-            model=self.config.model,
-            max_tokens=self.config.max_tokens or 4000,
-            temperature=self.config.temperature,
-            messages=[{"role": "user", "content": prompt}],
-            **(self.config.additional_params or {}),
-        )
-        return response.content[0].text
-
-
-class GoogleProvider(LLMProvider):
-    """Google Gemini provider"""
-
-    def _initialize_client(self):
-        import google.generativeai as genai
-
-        genai.configure(api_key=self.config.api_key)
-        self._client = genai.GenerativeModel(self.config.model)
-
-    def generate(self, prompt: str) -> str:
-        response = self.client.generate_content(
-            prompt,
-            generation_config={
-                "temperature": self.config.temperature,
-                "max_output_tokens": self.config.max_tokens,
-                **(self.config.additional_params or {}),
-            },
-        )
-        return response.text
-
-
-class CohereProvider(LLMProvider):
-    """Cohere provider"""
-
-    def _initialize_client(self):
-        import cohere
-
-        self._client = cohere.Client(api_key=self.config.api_key)
-
-    def generate(self, prompt: str) -> str:
-        response = self.client.generate(
-            model=self.config.model,
-            prompt=prompt,
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
-            **(self.config.additional_params or {}),
-        )
-        return response.generations[0].text
-
-
-# Factory function for easy provider creation
-def create_llm_provider(provider_type: str, **kwargs) -> LLMProvider:
-    """Factory function to create LLM providers"""
-    config = LLMConfig(**kwargs)
-
-    providers = {
-        "openai": OpenAIProvider,
-        "anthropic": AnthropicProvider,
-        "google": GoogleProvider,
-        "cohere": CohereProvider,
-    }
-
-    if provider_type not in providers:
-        raise ValueError(f"Unknown provider type: {provider_type}")
-
-    return providers[provider_type](config)
-
-
-@dataclass
+@dataclass(slots=True)
 class Article:
     """Represents a single news article"""
 
@@ -151,18 +29,10 @@ class Article:
     summary: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "title": self.title,
-            "content": self.content,
-            "url": self.url,
-            "source": self.source,
-            "publish_date": self.publish_date,
-            "author": self.author,
-            "summary": self.summary,
-        }
+        return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class FormattedPost:
     """Represents a formatted social media post"""
 
@@ -175,18 +45,10 @@ class FormattedPost:
     publish_date: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "title": self.title,
-            "summary": self.summary,
-            "caption": self.caption,
-            "source": self.source,
-            "url": self.url,
-            "thumbnail_url": self.thumbnail_url,
-            "publish_date": self.publish_date,
-        }
+        return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineResult:
     """Result of the tech news pipeline"""
 
@@ -219,5 +81,6 @@ class PipelineResult:
 
     def save_to_file(self, filename: str):
         """Save result to JSON file"""
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        # orjson always emits UTF-8 bytes
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
@@ -1,23 +1,31 @@
 from abc import ABC, abstractmethod
 import asyncio
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 from datetime import datetime
 import json
 import os
+import re
 import shutil
-from io import BytesIO
+import orjson
 
 from byteskript_agent.llm_providers import (
+    LLM_CACHE_STATS,
     GoogleProvider,
     LLMConfig,
+    LLMGenerationError,
     LLMProvider,
     Prompt,
 )
 from byteskript_agent.models import Article, FormattedPost, PipelineResult
-from byteskript_agent.tools.playwright_tool import visit_urls_and_extract_content
-from byteskript_agent.tools.serper_tools import SerperQuery, search_scraper_multiple, search_serper_multiple
-from byteskript_agent.telegram_sender import TelegramSender
+from byteskript_agent.tools.playwright_tool import close_browser_pool, iter_extracted_content
+from byteskript_agent.tools.serper_tools import (
+    SerperQuery,
+    aclose_client,
+    search_scraper_multiple,
+    search_serper_multiple,
+)
+from byteskript_agent.telegram_sender import TelegramSender, encode_png
 from byteskript_agent.img_gen.gen_img import ImageGenerator
 from byteskript_agent.img_gen.json_processor import NewsDataProcessor
 from telegram.ext import (
@@ -32,14 +40,92 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+
+# Only a fence wrapping the whole response is stripped; backticks inside JSON
+# strings are left alone
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
 
 def parse_json_response(response: str) -> List[str]:
     """Parse a JSON response into a list of strings"""
-    response = response.replace("```json", "").replace("```", "").strip()
-    return json.loads(response)
+    return orjson.loads(_FENCE.sub("", response.strip()))
+
+
+def _prompt_json(data: Any) -> str:
+    """Serialize prompt input compactly; indentation only costs tokens"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+# The quality filter only needs enough of each summary to judge the story
+FILTER_SUMMARY_MAX_CHARS = 800
+
+
+# Article text sent to the formatter; the lead and keyword-heavy paragraphs
+# carry the story, the rest is mostly navigation and boilerplate
+ARTICLE_CONTENT_MAX_CHARS = 2000
+
+
+def _compress(
+    text: str, keywords: List[str], max_chars: int = ARTICLE_CONTENT_MAX_CHARS
+) -> str:
+    """Extractively shorten article text to max_chars, keeping whole paragraphs"""
+    if len(text) <= max_chars:
+        return text
+
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    keyword_set = {keyword.lower() for keyword in keywords or []}
+
+    def score(item):
+        i, paragraph = item
+        words = set(re.findall(r"\w+", paragraph.lower()))
+        return (i < 2, len(words & keyword_set))
+
+    # Stable sort: ties keep their original position
+    kept, used = [], 0
+    for i, paragraph in sorted(enumerate(paragraphs), key=score, reverse=True):
+        if used + len(paragraph) > max_chars:
+            continue
+        kept.append(i)
+        used += len(paragraph) + 2
 
+    if not kept:
+        return text[:max_chars]
+    return "\n\n".join(paragraphs[i] for i in sorted(kept))
 
-@dataclass
+
+def _batch_iter(items: List[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Yield consecutive sub-lists of at most batch_size items"""
+    for start in range(0, len(items), batch_size):
+        yield items[start : start + batch_size]
+
+
+async def _generate_batches(
+    llm: LLMProvider, build_prompt, batches, config: "PipelineConfig"
+) -> List[str]:
+    """Run one generation per batch concurrently; batches that still fail after
+    retries are skipped so the run continues with the rest"""
+    responses = await asyncio.gather(
+        *(llm.agenerate(build_prompt(batch, config)) for batch in batches),
+        return_exceptions=True,
+    )
+    for response in responses:
+        if isinstance(response, LLMGenerationError):
+            print(f"Skipping batch: {response}")
+        elif isinstance(response, BaseException):
+            raise response
+    return [r for r in responses if not isinstance(r, BaseException)]
+
+
+def _with_ids(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Tag each item with its index so batched LLM output can be merged back"""
+    return [{"id": i, **item} for i, item in enumerate(items)]
+
+
+@dataclass(frozen=True, slots=True)
 class PipelineConfig:
     """Configuration for the tech news pipeline"""
 
@@ -48,16 +134,21 @@ class PipelineConfig:
     max_queries: int = 12
     save_backup: bool = True
     output_filename: str = "data.json"
+    # Articles per LLM call in the filtering and formatting steps; the system
+    # prompt is sent once per batch instead of once per article
+    batch_size: int = 6
 
 
 class PipelineStep(ABC):
     """Abstract base class for pipeline steps"""
 
+    __slots__ = ("llm",)
+
     def __init__(self, llm_provider: LLMProvider):
         self.llm = llm_provider
 
     @abstractmethod
-    def execute(self, data: Any, config: PipelineConfig) -> Any:
+    async def execute(self, data: Any, config: PipelineConfig) -> Any:
         """Execute the pipeline step"""
         pass
 
@@ -65,7 +156,9 @@ class PipelineStep(ABC):
 class QueryGenerationStep(PipelineStep):
     """Step 1: Generate search queries"""
 
-    def execute(self, focus: str, config: PipelineConfig) -> List[str]:
+    __slots__ = ()
+
+    async def execute(self, focus: str, config: PipelineConfig) -> List[str]:
         system_prompt = """
         You are an expert SEO assistant. 
         Your job is to craft concise, high-coverage search queries for breaking tech news.
@@ -102,7 +195,7 @@ class QueryGenerationStep(PipelineStep):
         No extra keys, comments, or prose.
         """
 
-        response = self.llm.generate(
+        response = await self.llm.agenerate(
             Prompt(user_message=user_prompt, system_message=system_prompt)
         )
         return parse_json_response(response)
@@ -111,7 +204,9 @@ class QueryGenerationStep(PipelineStep):
 class FindBestURLsStep(PipelineStep):
     """Step 2: Find the best URLs"""
 
-    def execute(
+    __slots__ = ()
+
+    async def execute(
         self, results: List[Dict[str, Any]], config: PipelineConfig
     ) -> List[str]:
         system_prompt = """
@@ -126,7 +221,7 @@ class FindBestURLsStep(PipelineStep):
 
         Input results:
         <search_results>
-        {json.dumps(results, indent=2)}
+        {_prompt_json(results)}
         </search_results>
 
         Selection criteria:
@@ -151,7 +246,7 @@ class FindBestURLsStep(PipelineStep):
         No commentary, markdown, or keys besides the raw strings. Only Array of URLs.
         """
         print(user_prompt)
-        response = self.llm.generate(
+        response = await self.llm.agenerate(
             Prompt(user_message=user_prompt, system_message=system_prompt)
         )
         return parse_json_response(response)
@@ -160,9 +255,41 @@ class FindBestURLsStep(PipelineStep):
 class ContentFilteringStep(PipelineStep):
     """Step 3: Filter content for quality"""
 
-    def execute(
+    __slots__ = ()
+
+    async def execute(
         self, articles: List[Dict[str, Any]], config: PipelineConfig
-    ) -> List[str]:
+    ) -> List[Dict[str, Any]]:
+        batches = _batch_iter(_with_ids(articles), config.batch_size)
+        responses = await _generate_batches(self.llm, self._prompt, batches, config)
+
+        passed_ids = set()
+        for response in responses:
+            for article_id in parse_json_response(response):
+                try:
+                    passed_ids.add(int(article_id))
+                except (TypeError, ValueError):
+                    continue
+
+        # Map ids back to the original articles, in input order; articles are
+        # matched by position, so duplicate or empty titles stay distinct
+        return [article for i, article in enumerate(articles) if i in passed_ids]
+
+    def _prompt(self, batch: List[Dict[str, Any]], config: PipelineConfig) -> Prompt:
+        # Authors, keywords and the full text don't help judge quality; drop
+        # them and cap the summary length to keep the prompt small
+        filter_input = [
+            {
+                **{
+                    k: v
+                    for k, v in article.items()
+                    if k not in ("authors", "keywords", "text")
+                },
+                "summary": (article.get("summary") or "")[:FILTER_SUMMARY_MAX_CHARS],
+            }
+            for article in batch
+        ]
+
         system_prompt = """
         You are a meticulous tech-news curator.  
         Return ONLY the JSON array requested—no prose.
@@ -185,39 +312,56 @@ class ContentFilteringStep(PipelineStep):
         • Older than 24 h  
         • Duplicate or near-duplicate stories
 
-        Input:
+        Input (each article has a numeric "id"):
         <articles>
-        {json.dumps(articles, indent=2)}
+        {_prompt_json(filter_input)}
         </articles>
 
         Output:
-        A pure JSON array of the **original titles** that pass, e.g.:
+        A pure JSON array of the **ids** of the articles that pass, e.g.:
 
-        [
-        "OpenAI Introduces GPT-5 With 2 Trillion Parameters",
-        "Singapore's InFlight Secures $25 M to Build Quantum-Safe VPNs",
-        "Microsoft Discloses July 2025 Patch Tuesday Fixing 132 Vulnerabilities"
-        ]
+        [0, 3, 4]
 
         No markdown, labels, or extra keys.
         """
 
-        response = self.llm.generate(
-            Prompt(
-                user_message=user_prompt.strip(), system_message=system_prompt.strip()
-            )
+        return Prompt(
+            user_message=user_prompt.strip(), system_message=system_prompt.strip()
         )
 
-        titles = parse_json_response(response)
-        return titles
-
 
 class PostFormattingStep(PipelineStep):
     """Step 4: Format articles into social media posts"""
 
-    def execute(
+    __slots__ = ()
+
+    async def execute(
         self, articles: List[Dict[str, Any]], config: PipelineConfig
     ) -> List[Dict[str, Any]]:
+        batches = _batch_iter(_with_ids(articles), config.batch_size)
+        responses = await _generate_batches(self.llm, self._prompt, batches, config)
+
+        posts = []
+        for response in responses:
+            parsed = parse_json_response(response)
+            # Malformed model output (bare strings, nested lists) is dropped
+            # rather than ending the run
+            entries = [post for post in parsed if isinstance(post, dict)]
+            if len(entries) < len(parsed):
+                print(f"Skipping {len(parsed) - len(entries)} malformed posts")
+            posts.extend(entries)
+
+        # Merge batches back into input order; posts missing an id go last
+        posts.sort(
+            key=lambda post: (0, post["id"])
+            if isinstance(post.get("id"), int)
+            else (1, 0)
+        )
+        for post in posts:
+            post.pop("id", None)
+        return posts
+
+    def _prompt(self, batch: List[Dict[str, Any]], config: PipelineConfig) -> Prompt:
         system_prompt = """
         You are a tech-savvy social-media copywriter for Bangladeshi readers.
         Turn news articles into viral, meme-friendly posts.
@@ -229,6 +373,7 @@ class PostFormattingStep(PipelineStep):
         For each article below inside <articles> tag, output one JSON object with these keys:
 
         {{
+        "id": 0,             # the article's id, unchanged
         "title": "",         # Meme style, Title Case, No Emojis, Or Special Characters, max 25 words, Hooky and catchy
         "summary": "",       # max 150 words, crisp value delivery
         "bangla_title": "",  # max 25 words, bangla title
@@ -251,9 +396,9 @@ class PostFormattingStep(PipelineStep):
         - Keep markdown, hashtags, @handles *out* of title & summary.
         - Source should not be a URL, it should be a name of the source like TechCrunch, The Verge, etc.
 
-        Input:  
+        Input (each article has a numeric "id"):  
         <articles>
-        {json.dumps(articles, indent=2)}
+        {_prompt_json(batch)}
         </articles>
 
         Output:
@@ -262,6 +407,7 @@ class PostFormattingStep(PipelineStep):
         Example:
         [
         {{
+            "id": 0,
             "title": "Apple Drops Vision Pro 2—Your Wallet Just Cried",
             "summary": "Apple's second-gen headset doubles battery life and slashes weight by 30 %. Devs get a new spatial SDK today. Here's why that's huge ▶️",
             "caption": "Vision Pro 2—who's buying? 🙋‍♀️",
@@ -275,15 +421,10 @@ class PostFormattingStep(PipelineStep):
         No extra keys, comments, or prose.
         """
 
-        response = self.llm.generate(
-            Prompt(
-                user_message=user_prompt.strip(), system_message=system_prompt.strip()
-            )
+        return Prompt(
+            user_message=user_prompt.strip(), system_message=system_prompt.strip()
         )
 
-        posts = parse_json_response(response)
-        return posts
-
 
 class TechNewsPipeline:
     """Main pipeline orchestrator"""
@@ -298,7 +439,7 @@ class TechNewsPipeline:
 
 async def log(message: str):
     await telegram_app.bot.send_message(
-        chat_id=os.getenv("TELEGRAM_CHAT_ID"),
+        chat_id=TELEGRAM_CHAT_ID,
         text=message,
         parse_mode="Markdown",
     )
@@ -306,9 +447,10 @@ async def log(message: str):
 async def run_pipeline(
     pipeline: TechNewsPipeline, telegram_app: Application, focus: str
 ):
-    queries = pipeline.query_generation_step.execute(
-        focus, PipelineConfig(current_date=datetime.now().strftime("%m-%d-%Y"))
-    )
+    # One config for the whole run, so a run spanning midnight sees one date
+    config = PipelineConfig(current_date=datetime.now().strftime("%m-%d-%Y"))
+
+    queries = await pipeline.query_generation_step.execute(focus, config)
 
     await log(f"Searching {len(queries)} queries")
 
@@ -319,21 +461,35 @@ async def run_pipeline(
         ]
     )
 
-    best_urls = pipeline.find_best_urls_step.execute(
-        results, PipelineConfig(current_date=datetime.now().strftime("%m-%d-%Y"))
-    )
+    best_urls = await pipeline.find_best_urls_step.execute(results, config)
 
     await log(f"Visiting {len(best_urls)} filtered urls")
 
-    contents = await visit_urls_and_extract_content(best_urls)
-
-    prompt_contexts = []
-
-    for content in contents:
+    # Articles are filtered and formatted in batches as soon as enough of them
+    # have been extracted, so LLM calls overlap with the remaining page visits
+    extracted_count = 0
+    passed_count = 0
+
+    async def filter_and_format(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        nonlocal passed_count
+        summary_contexts = await pipeline.content_filtering_step.execute(batch, config)
+        # The full text is only needed once, compressed, for the formatter
+        for context in summary_contexts:
+            context["content"] = _compress(context.pop("text"), context["keywords"])
+        passed_count += len(summary_contexts)
+        if not summary_contexts:
+            return []
+        return await pipeline.post_formatting_step.execute(summary_contexts, config)
+
+    batch_tasks = []
+    pending_contexts = []
+
+    async for content in iter_extracted_content(best_urls):
         if "error" in content:
             continue
 
-        prompt_contexts.append(
+        extracted_count += 1
+        pending_contexts.append(
             {
                 "title": content["title"],
                 "summary": content["summary"],
@@ -342,49 +498,31 @@ async def run_pipeline(
                 "publish_date": content["publish_date"],
                 "authors": content["authors"],
                 "keywords": content["keywords"],
+                "text": content["text"],
             }
         )
 
-    await log(f"Filtering {len(prompt_contexts)} articles")
+        if len(pending_contexts) == config.batch_size:
+            batch_tasks.append(asyncio.create_task(filter_and_format(pending_contexts)))
+            pending_contexts = []
 
-    filtered_data = pipeline.content_filtering_step.execute(
-        prompt_contexts,
-        PipelineConfig(current_date=datetime.now().strftime("%m-%d-%Y")),
-    )
+    if pending_contexts:
+        batch_tasks.append(asyncio.create_task(filter_and_format(pending_contexts)))
 
-    summary_contexts = []
-
-    await log(f"Filtered {len(filtered_data)} articles")
-
-    for title in filtered_data:
-        for content in contents:
-            if "error" in content:
-                continue
-
-            if content["title"] == title:
-                summary_contexts.append(
-                    {
-                        "title": content["title"],
-                        "summary": content["summary"],
-                        "url": content["article_url"],
-                        "source": content["source_url"],
-                        "publish_date": content["publish_date"],
-                        "authors": content["authors"],
-                        "keywords": content["keywords"],
-                        "content": content["text"],
-                    }
-                )
+    await log(f"Filtering and formatting {extracted_count} articles")
 
-    await log(f"Formatting {len(summary_contexts)} articles")
+    formatted_batches = await asyncio.gather(*batch_tasks)
+    formatted_data = [post for batch in formatted_batches for post in batch]
 
-    formatted_data = pipeline.post_formatting_step.execute(
-        summary_contexts,
-        PipelineConfig(current_date=datetime.now().strftime("%m-%d-%Y")),
-    )
+    await log(f"Formatted {len(formatted_data)} posts from {passed_count} articles")
 
     with open("formatted_data.json", "w") as f:
         json.dump(formatted_data, f, indent=2)
 
+    await log(
+        f"LLM cache: {LLM_CACHE_STATS['hits']} hits, {LLM_CACHE_STATS['misses']} misses"
+    )
+
     return formatted_data
 
 
@@ -398,35 +536,35 @@ async def run_and_send(
 
     async def on_one_generated(img, data):
         """Callback function when an image is generated"""
-        img_bytes = BytesIO()
-        img.save(img_bytes, format="PNG")
-        img_bytes.seek(0)
+        img_bytes = await encode_png(img)
 
         # Send image and message to Telegram
         await telegram_app.bot.send_document(
-            chat_id=os.getenv("TELEGRAM_CHAT_ID"),
+            chat_id=TELEGRAM_CHAT_ID,
             document=img_bytes,
             filename=f"{data['title'].replace(' ', '_').lower()[:100]}.png",
             parse_mode="Markdown",
         )
 
-        await telegram_app.bot.send_message(
-            chat_id=os.getenv("TELEGRAM_CHAT_ID"),
-            text=data["summary"],
-            parse_mode="Markdown",
-        )
-
+        # The text messages are independent of each other, so send them together
+        texts = [data["summary"]]
         if "bangla_summary" in data:
-            await telegram_app.bot.send_message(
-                chat_id=os.getenv("TELEGRAM_CHAT_ID"),
-                text=data["bangla_summary"],
-                parse_mode="Markdown",
-            )
-
-        await telegram_app.bot.send_message(
-            chat_id=os.getenv("TELEGRAM_CHAT_ID"),
-            text=data["url"],
-            parse_mode="Markdown",
+            texts.append(data["bangla_summary"])
+
+        await asyncio.gather(
+            *(
+                telegram_app.bot.send_message(
+                    chat_id=TELEGRAM_CHAT_ID,
+                    text=text,
+                    parse_mode="Markdown",
+                )
+                for text in texts
+            ),
+            # A bare URL needs no Markdown parsing
+            telegram_app.bot.send_message(
+                chat_id=TELEGRAM_CHAT_ID,
+                text=data["url"],
+            ),
         )
 
     # Process formatted data to generate images and send to Telegram
@@ -434,7 +572,7 @@ async def run_and_send(
     await processor.process_data(formatted_data)
 
     await telegram_app.bot.send_message(
-        chat_id=os.getenv("TELEGRAM_CHAT_ID"),
+        chat_id=TELEGRAM_CHAT_ID,
         text="Pipeline completed",
         parse_mode="Markdown",
     )
@@ -443,18 +581,28 @@ async def run_and_send(
 if __name__ == "__main__":
     llm_provider = GoogleProvider(
         config=LLMConfig(
-            api_key=os.getenv("GEMINI_API_KEY"),
+            api_key=GEMINI_API_KEY,
             model="gemini-2.5-flash",
             temperature=0.0,
         )
     )
 
     telegram_sender = TelegramSender(
-        bot_token=os.getenv("TELEGRAM_BOT_TOKEN"),
-        chat_id=os.getenv("TELEGRAM_CHAT_ID"),
+        bot_token=TELEGRAM_BOT_TOKEN,
+        chat_id=TELEGRAM_CHAT_ID,
     )
 
-    telegram_app = ApplicationBuilder().token(os.getenv("TELEGRAM_BOT_TOKEN")).build()
+    async def close_shared_clients(app: Application):
+        # Runs on the bot's loop during shutdown, the loop the clients live on
+        await aclose_client()
+        await close_browser_pool()
+
+    telegram_app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .post_shutdown(close_shared_clients)
+        .build()
+    )
 
     pipeline = TechNewsPipeline(llm_provider)
 
@@ -1,7 +1,30 @@
+import asyncio
 from io import BytesIO
+from PIL import Image
 from telegram.ext import ApplicationBuilder
 
 
+def _encode_png(img: Image.Image) -> BytesIO:
+    # Uploads are transient, so the fastest zlib level is worth the larger file
+    buf = BytesIO()
+    img.save(buf, format="PNG", optimize=False, compress_level=1)
+    buf.seek(0)
+    return buf
+
+
+async def encode_png(img: Image.Image) -> BytesIO:
+    """
+    Encode an image as PNG for upload without blocking the event loop
+
+    Args:
+        img (Image.Image): Image to encode
+
+    Returns:
+        BytesIO: PNG bytes, positioned at the start
+    """
+    return await asyncio.to_thread(_encode_png, img)
+
+
 class TelegramSender:
     def __init__(self, bot_token: str, chat_id: str = None):
         """
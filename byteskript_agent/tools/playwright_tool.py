@@ -1,67 +1,411 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict, Any
-from playwright.async_api import async_playwright
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional
+from lxml import etree
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
 from urllib.parse import urljoin, urlparse
 import json
 import asyncio
+import logging
+import multiprocessing
+import httpx
 import newspaper
 import nltk
+import os
 
-try:
-    nltk.data.find("tokenizers/punkt_tab")
-except LookupError:
-    nltk.download("punkt_tab")
+log = logging.getLogger(__name__)
 
+# Marker written once punkt_tab is known to be installed, so later imports
+# (including every parse worker process) skip nltk's data path search
+PUNKT_SENTINEL = os.path.expanduser("~/.cache/byteskript/punkt_ok")
 
-async def visit_urls_and_extract_content(urls: List[str]) -> str:
+
+def _ensure_punkt():
+    if os.path.exists(PUNKT_SENTINEL):
+        return
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+    except LookupError:
+        if not nltk.download("punkt_tab"):
+            # No sentinel, so the next import tries the download again
+            log.warning("Could not download nltk punkt_tab; article keywords will fail")
+            return
+    os.makedirs(os.path.dirname(PUNKT_SENTINEL), exist_ok=True)
+    open(PUNKT_SENTINEL, "w").close()
+
+
+_ensure_punkt()
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+POOL_SIZE = 4
+MAX_CONCURRENT_PAGES = 6
+# Resources that never contribute to the extracted article text
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+# Analytics and ad hosts; a request to any of these or their subdomains is aborted
+BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "scorecardresearch.com",
+    "chartbeat.com",
+    "hotjar.com",
+    "taboola.com",
+    "outbrain.com",
+)
+NAVIGATION_TIMEOUT_MS = 5000
+# How long to wait for the article markup once the response has started
+CONTENT_WAIT_MS = 2000
+STREAM_CHUNK_SIZE = 65536
+MAX_STATIC_CONNECTIONS = 20
+# Statically fetched pages with less extracted text than this are treated as
+# client-side rendered shells and re-visited in the browser
+MIN_STATIC_TEXT_LENGTH = 500
+
+# Shared extraction settings; HTML is always supplied by us, so newspaper never
+# needs to fetch images or remember previously seen articles
+NEWSPAPER_CONFIG = newspaper.Config()
+NEWSPAPER_CONFIG.fetch_images = False
+NEWSPAPER_CONFIG.memoize_articles = False
+NEWSPAPER_CONFIG.language = "en"
+NEWSPAPER_CONFIG.browser_user_agent = USER_AGENT
+
+
+class BrowserPool:
+    """
+    Process-wide Chromium instance with a pool of pre-warmed browser contexts.
+
+    Launching Chromium dominates the cost of a short scrape, so the browser is
+    started once and reused across tool calls. The pool is bound to the event
+    loop it was started on and is transparently restarted if a later call runs
+    on a different loop, or if Chromium has disconnected.
+    """
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        self._loop = None
+        self._ready = None
+        self._manager = None
+        self._playwright = None
+        self._browser = None
+        self._contexts: asyncio.Queue = None
+
+    async def _start(self):
+        try:
+            self._manager = async_playwright()
+            self._playwright = await self._manager.start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            for _ in range(self.size):
+                context = await self._browser.new_context(user_agent=USER_AGENT)
+                context.set_default_navigation_timeout(NAVIGATION_TIMEOUT_MS)
+                await context.route("**/*", _block_heavy_resources)
+                self._contexts.put_nowait(context)
+        except Exception:
+            self._loop = None
+            raise
+
+    async def acquire(self):
+        """Borrow a browser context, starting the browser on first use."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._browser is not None:
+                self._kill_stale_driver()
+            # Concurrent callers on the same loop share a single startup task
+            self._loop = loop
+            self._contexts = asyncio.Queue()
+            self._ready = loop.create_task(self._start())
+        elif (
+            self._ready.done()
+            and self._browser is not None
+            and not self._browser.is_connected()
+        ):
+            # Chromium crashed or was killed; callers already waiting on the
+            # queue get contexts of the new browser
+            log.warning("Browser disconnected; restarting the pool")
+            self._ready = loop.create_task(self._restart())
+        await self._ready
+        return await self._contexts.get()
+
+    def release(self, context):
+        """Return a borrowed browser context to the pool."""
+        # Contexts of a disconnected or replaced browser are dropped
+        if context.browser is self._browser and self._browser.is_connected():
+            self._contexts.put_nowait(context)
+
+    async def _restart(self):
+        await self._stop_driver(self._browser, self._playwright)
+        while not self._contexts.empty():
+            self._contexts.get_nowait()
+        await self._start()
+
+    @staticmethod
+    async def _stop_driver(browser, playwright):
+        """Shut down a browser and driver of the current loop via the public API."""
+        try:
+            if browser.is_connected():
+                await browser.close()
+            await playwright.stop()
+        except Exception:
+            log.warning("Error while stopping the Playwright driver", exc_info=True)
+
+    def _kill_stale_driver(self):
+        """Stop a driver started on an earlier event loop.
+
+        Its connection is bound to that loop and can't be awaited from this one,
+        so the driver process is killed directly; Chromium exits with it when
+        its pipe closes. Playwright has no public handle on that process, so it
+        is looked up defensively.
+        """
+        proc = self._manager
+        for attr in ("_connection", "_transport", "_proc"):
+            proc = getattr(proc, attr, None)
+        if proc is None:
+            log.warning(
+                "Can't find the Playwright driver started on a previous event loop; "
+                "it may keep running until this process exits"
+            )
+        else:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                # Already exited
+                pass
+        self._reset()
+
+    async def close(self):
+        """Shut down the browser and the Playwright driver."""
+        if self._browser is None:
+            self._reset()
+        elif self._loop is not asyncio.get_running_loop():
+            self._kill_stale_driver()
+        else:
+            await self._stop_driver(self._browser, self._playwright)
+            self._reset()
+
+    def _reset(self):
+        self._manager = None
+        self._browser = None
+        self._playwright = None
+        self._loop = None
+        self._ready = None
+
+
+_BROWSER_POOL = BrowserPool()
+
+
+async def _block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(
+        urlparse(request.url).hostname or ""
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _is_blocked_host(host: str) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in BLOCKED_DOMAINS)
+
+
+async def close_browser_pool():
+    """Close the shared browser. Call on application shutdown."""
+    await _BROWSER_POOL.close()
+    if _parse_executor.cache_info().currsize:
+        _drop_parse_executor(_parse_executor())
+
+
+@lru_cache(maxsize=1)
+def _parse_executor() -> ProcessPoolExecutor:
+    """Worker processes for newspaper's CPU-bound parse/nlp, created on first use."""
+    # forkserver workers don't inherit the httpx, aiohttp and Playwright threads
+    # already running in this process
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("forkserver")
+    )
+
+
+def _drop_parse_executor(executor: ProcessPoolExecutor):
+    """Shut down executor and forget it, unless a newer pool is already cached."""
+    if _parse_executor.cache_info().currsize and _parse_executor() is executor:
+        _parse_executor.cache_clear()
+    executor.shutdown(wait=False)
+
+
+async def _parse_article_in_worker(url: str, html: str) -> Dict[str, Any]:
+    """Run _parse_article off the event loop and outside this process's GIL."""
+    loop = asyncio.get_running_loop()
+    executor = _parse_executor()
+    try:
+        return await loop.run_in_executor(executor, _parse_article, url, html)
+    except BrokenProcessPool:
+        # A crashed worker (OOM, lxml segfault) breaks the whole pool; replace
+        # it so the long-running bot keeps parsing, and retry this page once
+        log.warning("Parse worker pool broke on %s; starting a new one", url)
+        _drop_parse_executor(executor)
+        return await loop.run_in_executor(_parse_executor(), _parse_article, url, html)
+
+
+async def visit_urls_and_extract_content(urls: List[str]) -> List[Dict[str, Any]]:
     """
-    Asynchronously visit a list of URLs using Playwright and extract content and URLs.
+    Asynchronously visit a list of URLs and extract content and URLs.
+
+    Pages are first streamed over plain HTTP and parsed incrementally, stopping
+    once the <article> element is complete. Only pages whose static HTML yields
+    too little text (client-side rendered sites) fall back to a pooled
+    Playwright browser.
     Args:
         urls: The list of URLs to visit.
     Returns:
-        JSON string containing a list of dictionaries with extracted data for each URL.
+        A list of dictionaries with extracted data for each URL, in input order.
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        tasks = [_visit_and_extract(context, url) for url in urls]
-        results = await asyncio.gather(*tasks)
-        await browser.close()
-    return results
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+    async with _static_client() as client:
+        tasks = [_visit_and_extract(url, client, semaphore) for url in urls]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    # A single failing URL must not abort the rest of the batch
+    return [
+        {"error": f"Playwright error: {str(result)}", "url": url}
+        if isinstance(result, Exception)
+        else result
+        for url, result in zip(urls, results)
+    ]
+
+
+async def iter_extracted_content(urls: List[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Like visit_urls_and_extract_content, but yield each URL's result as soon as
+    it is ready, so callers can start on early articles while slow pages load.
+    Args:
+        urls: The list of URLs to visit.
+    Returns:
+        An async iterator of result dictionaries, in completion order.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+    async with _static_client() as client:
+        tasks = {
+            asyncio.ensure_future(_visit_and_extract(url, client, semaphore)): url
+            for url in urls
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        yield {
+                            "error": f"Playwright error: {str(task.exception())}",
+                            "url": tasks[task],
+                        }
+                    else:
+                        yield task.result()
+        finally:
+            # The consumer stopped early; don't leave visits running. Wait for
+            # the cancellations so their streams and pages close before the
+            # HTTP client does
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _static_client() -> httpx.AsyncClient:
+    """HTTP client shared by one batch of static page fetches.
+
+    HTTP/2 lets several articles from the same site share one connection.
+    """
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        http2=True,
+        follow_redirects=True,
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=MAX_STATIC_CONNECTIONS),
+    )
+
+
+async def _visit_and_extract(
+    url: str, client: httpx.AsyncClient, semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    """Extract a single URL, trying a streamed static fetch before Playwright."""
+    try:
+        html = await _stream_article_html(url, client)
+        if html is not None:
+            result = await _parse_article_in_worker(url, html)
+            if len(result["text"]) >= MIN_STATIC_TEXT_LENGTH:
+                return result
+    except Exception:
+        # Anything unexpected from the static path falls back to a real browser
+        pass
+
+    # Only browser renders are bounded by the page semaphore; static fetches
+    # are limited by the HTTP client's connection pool
+    async with semaphore:
+        return await _render_and_extract(url)
+
+
+async def _stream_article_html(url: str, client: httpx.AsyncClient) -> Optional[str]:
+    """
+    Stream a page's HTML and stop reading once an <article> with enough text closes.
+    Args:
+        url: The URL to fetch.
+        client: Shared HTTP client for the current batch.
+    Returns:
+        The HTML received up to the end of the article, the whole page if it has
+        no long enough <article> element, or None if the request failed.
+    """
+    parser = etree.HTMLPullParser(events=("end",))
+    received = bytearray()
+    async with client.stream("GET", url) as response:
+        if response.status_code >= 400:
+            return None
+        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+            received += chunk
+            parser.feed(chunk)
+            if any(
+                element.tag == "article"
+                and len("".join(element.itertext())) >= MIN_STATIC_TEXT_LENGTH
+                for _, element in parser.read_events()
+            ):
+                # The rest of the page (comments, footers, related links) is
+                # never downloaded; short teaser <article> cards keep reading
+                break
+        return received.decode(response.encoding or "utf-8", errors="replace")
 
 
-async def _visit_and_extract(context, url: str) -> Dict[str, Any]:
+async def _render_and_extract(url: str) -> Dict[str, Any]:
     """Visit a single URL in a new page and extract its data."""
-    page = await context.new_page()
+    # Contexts are only held while opening the page, so several pages can
+    # share one context and concurrency is bounded by MAX_CONCURRENT_PAGES.
+    context = await _BROWSER_POOL.acquire()
+    try:
+        page = await context.new_page()
+    finally:
+        _BROWSER_POOL.release(context)
+
     try:
-        response = await page.goto(url, wait_until="domcontentloaded", timeout=10000)
+        # Only the document is needed, so return as soon as the response starts
+        # and give the page a short budget to render its article markup
+        response = await page.goto(url, wait_until="commit")
         if not response or response.status >= 400:
             return {
                 "error": f"Failed to load page. Status: {response.status if response else 'Unknown'}",
                 "url": url,
             }
+        try:
+            await page.wait_for_selector("article, main", timeout=CONTENT_WAIT_MS)
+        except PlaywrightTimeoutError:
+            # Extract whatever has rendered so far
+            pass
 
         content = await page.content()
-        article = newspaper.Article(url)
-        article.set_html(content)
-        article.parse()
-        article.nlp()
-
-        result = {
-            "title": article.title,
-            "text": article.text,
-            "top_image": article.top_image,
-            "authors": article.authors,
-            "summary": article.summary,
-            "keywords": article.keywords,
-            "publish_date": article.publish_date.strftime("%Y-%m-%d")
-            if type(article.publish_date) is datetime
-            else article.publish_date,
-            "article_url": article.url,
-            "source_url": article.source_url,
-        }
+        result = await _parse_article_in_worker(url, content)
     except Exception as e:
         result = {"error": f"Playwright error: {str(e)}", "url": url}
     finally:
@@ -69,6 +413,28 @@ async def _visit_and_extract(context, url: str) -> Dict[str, Any]:
     return result
 
 
+def _parse_article(url: str, html: str) -> Dict[str, Any]:
+    """Run newspaper's extraction over already-fetched HTML."""
+    article = newspaper.Article(url, config=NEWSPAPER_CONFIG)
+    article.set_html(html)
+    article.parse()
+    article.nlp()
+
+    return {
+        "title": article.title,
+        "text": article.text,
+        "top_image": article.top_image,
+        "authors": article.authors,
+        "summary": article.summary,
+        "keywords": article.keywords,
+        "publish_date": article.publish_date.strftime("%Y-%m-%d")
+        if type(article.publish_date) is datetime
+        else article.publish_date,
+        "article_url": article.url,
+        "source_url": article.source_url,
+    }
+
+
 if __name__ == "__main__":
 
     async def main():
@@ -1,10 +1,118 @@
 from dataclasses import dataclass
+from datetime import date
+import hashlib
 import os
 import json
 import asyncio
-from typing import List, Any
-import httpx
-import requests
+import functools
+import logging
+import random
+from typing import List, Any, Optional
+import aiohttp
+import diskcache
+
+log = logging.getLogger(__name__)
+
+MAX_CONCURRENT_SEARCHES = 8
+CACHE_TTL_SECONDS = 3600
+# ScraperAPI renders the results page itself and can take well over a minute
+SCRAPER_TIMEOUT_SECONDS = 70
+
+_ALLOWED_SOURCE_TYPES = frozenset(("search", "news"))
+# Google's time filters: past day, week, month, year
+_ALLOWED_TBS = frozenset(("d", "w", "m", "y"))
+
+# Persistent across runs, so re-running the daily pipeline doesn't re-hit Serper
+_CACHE = diskcache.Cache("./.serper_cache")
+
+_SESSION = None
+_SESSION_LOOP = None
+
+# Searches currently running, by cache key; finished ones are in _CACHE
+_IN_FLIGHT: dict = {}
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Shared ClientSession, so searches and their retries reuse pooled connections.
+
+    The session is bound to the event loop it first ran on, so a new one is
+    created if called from a different loop, and the stale one is closed.
+    """
+    global _SESSION, _SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION_LOOP is not loop:
+        stale = _SESSION
+        # Swapped in before awaiting, so concurrent callers never see the stale one
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        _SESSION_LOOP = loop
+        if stale is not None:
+            await stale.close()
+    return _SESSION
+
+
+async def aclose_client():
+    """Close the shared search session. Call on application shutdown."""
+    global _SESSION, _SESSION_LOOP
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = _SESSION_LOOP = None
+
+
+@functools.cache
+def _serper_headers() -> dict:
+    """Serper request headers, built once the API key is first needed."""
+    api_key = os.getenv("SERPER_API_KEY")
+    if not api_key:
+        raise ValueError("SERPER_API_KEY environment variable not set.")
+    # Content-Type is set by the client when posting with json=
+    return {"X-API-KEY": api_key}
+
+
+@functools.cache
+def _scraper_api_key() -> str:
+    api_key = os.getenv("SCRAPER_API_KEY")
+    if not api_key:
+        raise ValueError("SCRAPER_API_KEY environment variable not set.")
+    return api_key
+
+
+async def _gather_or_cancel(aws) -> list:
+    """Like asyncio.gather, but once one awaitable fails the rest are cancelled
+    instead of running on and spending API quota (asyncio.TaskGroup needs 3.11)."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def _cache_key(query: str, country: str, search_type: str, **kwargs: Any) -> str:
+    """Key a search by its normalized query, parameters and the current day."""
+    normalized = " ".join(query.lower().split())
+    raw = json.dumps(
+        [normalized, country, search_type, kwargs, date.today().isoformat()],
+        sort_keys=True,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _backoff(base_delay: float, attempt: int) -> float:
+    """Full-jitter exponential backoff, so concurrent searches that fail together
+    don't all retry at the same moment."""
+    return random.uniform(0, base_delay * (2 ** attempt))
+
+
+def _retry_after(headers) -> Optional[float]:
+    """Seconds the server asked us to wait, if it sent a numeric Retry-After."""
+    try:
+        return max(0.0, float(headers.get("Retry-After")))
+    except (AttributeError, TypeError, ValueError):
+        return None
 
 
 async def search_serper(
@@ -26,42 +134,58 @@ async def search_serper(
     Returns:
         A JSON string containing the search results.
     """
-    api_key = os.getenv("SERPER_API_KEY")
-    if not api_key:
-        raise ValueError("SERPER_API_KEY environment variable not set.")
+    cache_key = _cache_key(query, country, search_type, **kwargs)
+    cached = _CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
+    headers = _serper_headers()
     url = f"https://google.serper.dev/{search_type}"
     payload = {"q": query, "gl": country, **kwargs}
-    headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
 
-    print(payload)
-    print(url)
-    print(headers)
+    # The headers carry the API key, so only the request itself is logged
+    log.debug("Serper request to %s: %s", url, payload)
 
     for attempt in range(max_retries + 1):
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, data=json.dumps(payload), headers=headers)
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
+            async with (await _get_session()).post(url, json=payload, headers=headers) as response:
+                if response.status >= 400:
+                    # Keep the body; Serper explains errors like exhausted credits there
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=await response.text(),
+                        headers=response.headers,
+                    )
+                result = await response.json()
+            # Only successful responses are cached; errors are returned as strings
+            _CACHE.set(cache_key, result, expire=CACHE_TTL_SECONDS)
+            return result
+        except aiohttp.ClientResponseError as e:
             if attempt == max_retries:
-                return f"Error using Serper API: {e.response.status_code} - {e.response.text}"
+                return f"Error using Serper API: {e.status} - {e.message}"
             
             # Retry on 5xx errors (server errors) and some 4xx errors that might be temporary
-            if e.response.status_code >= 500 or e.response.status_code in [429, 408]:
-                delay = base_delay * (2 ** attempt)
-                print(f"Attempt {attempt + 1} failed with status {e.response.status_code}. Retrying in {delay:.2f} seconds...")
+            if e.status >= 500 or e.status in [429, 408]:
+                delay = _retry_after(e.headers) or _backoff(base_delay, attempt)
+                log.warning(
+                    "Attempt %d failed with status %d. Retrying in %.2f seconds...",
+                    attempt + 1, e.status, delay,
+                )
                 await asyncio.sleep(delay)
                 continue
             else:
-                return f"Error using Serper API: {e.response.status_code} - {e.response.text}"
-        except (httpx.ConnectError, httpx.TimeoutException, httpx.ReadError) as e:
+                return f"Error using Serper API: {e.status} - {e.message}"
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
             if attempt == max_retries:
                 return f"Network error using Serper API after {max_retries + 1} attempts: {e}"
             
-            delay = base_delay * (2 ** attempt)
-            print(f"Attempt {attempt + 1} failed with network error: {e}. Retrying in {delay:.2f} seconds...")
+            delay = _backoff(base_delay, attempt)
+            log.warning(
+                "Attempt %d failed with network error: %s. Retrying in %.2f seconds...",
+                attempt + 1, e, delay,
+            )
             await asyncio.sleep(delay)
             continue
         except Exception as e:
@@ -75,7 +199,7 @@ class SerperQuery:
     source_type: str = "search"
 
     def __post_init__(self):
-        if self.source_type not in ["search", "news"]:
+        if self.source_type not in _ALLOWED_SOURCE_TYPES:
             self.source_type = "search"
 
 
@@ -88,12 +212,38 @@ async def search_serper_multiple(search_queries: List[SerperQuery]) -> List[dict
     Returns:
         A list of JSON strings, each containing the search results for a query.
     """
-    print(f"Searching for {search_queries} with type")
-    # DO not gather in a list, it will cause a memory error
-    results = [
-        await search_serper(query=query.q, country=query.gl, search_type=query.source_type)
-        for query in search_queries
-    ]
+    log.debug("Searching for %s", search_queries)
+    # Bound the fan-out so a large batch doesn't trip Serper's rate limits
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+    async def search_single(query: SerperQuery):
+        async with semaphore:
+            return await search_serper(
+                query=query.q, country=query.gl, search_type=query.source_type
+            )
+
+    def in_flight(key: str, query: SerperQuery) -> asyncio.Future:
+        # Duplicate queries, in this batch or a concurrent one, share one request
+        task = _IN_FLIGHT.get(key)
+        if task is None:
+            task = asyncio.ensure_future(search_single(query))
+            _IN_FLIGHT[key] = task
+            task.add_done_callback(lambda _: _IN_FLIGHT.pop(key, None))
+        # Shielded so one cancelled caller doesn't cancel the others' request
+        return asyncio.shield(task)
+
+    keys = [_cache_key(query.q, query.gl, query.source_type) for query in search_queries]
+    results = [_CACHE.get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    log.debug("Serper cache: %d hits, %d misses", len(results) - len(misses), len(misses))
+
+    if misses:
+        # Fail before fanning out rather than once per query
+        _serper_headers()
+
+    tasks = [in_flight(keys[i], search_queries[i]) for i in misses]
+    for i, result in zip(misses, await _gather_or_cancel(tasks)):
+        results[i] = result
     return results
 
 
@@ -104,7 +254,7 @@ class ScraperQuery:
     tbs: str = "d"  # d for last 24 hours
 
     def __post_init__(self):
-        if self.tbs not in ["d", "w", "m", "y"]:
+        if self.tbs not in _ALLOWED_TBS:
             self.tbs = "d"
 
 
@@ -117,13 +267,10 @@ async def search_scraper_multiple(search_queries: List[SerperQuery]) -> List[dic
         A list of JSON responses, each containing the search results for a query.
     """
     print(f"Searching for {search_queries} with ScraperAPI")
+    api_key = _scraper_api_key()
 
     async def search_single(query: SerperQuery) -> dict:
         """Helper function to perform a single search"""
-        api_key = os.getenv("SCRAPER_API_KEY")
-        if not api_key:
-            raise ValueError("SCRAPER_API_KEY environment variable not set.")
-
         payload = {
             "api_key": api_key,
             "query": query.q,
@@ -132,18 +279,18 @@ async def search_scraper_multiple(search_queries: List[SerperQuery]) -> List[dic
         }
 
         try:
-            response = await asyncio.to_thread(
-                requests.get,
+            async with (await _get_session()).get(
                 "https://api.scraperapi.com/structured/google/search",
                 params=payload,
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+                timeout=aiohttp.ClientTimeout(total=SCRAPER_TIMEOUT_SECONDS),
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return f"Error using ScraperAPI: {e}"
         except Exception as e:
             return f"Error using ScraperAPI: {e}"
 
     tasks = [search_single(query) for query in search_queries]
-    results = await asyncio.gather(*tasks)
+    results = await _gather_or_cancel(tasks)
     return results
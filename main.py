@@ -1,12 +1,13 @@
 import asyncio
-from io import BytesIO
 import autogen
 from datetime import datetime
-import json
+from functools import lru_cache
+import logging
 import os
-import shutil
+import re
 
 import autogen.tools
+import orjson
 from PIL import Image
 from byteskript_agent.agents import (
     create_agents_with_date,
@@ -14,12 +15,19 @@ from byteskript_agent.agents import (
 )
 from byteskript_agent.img_gen.gen_img import ImageGenerator
 from byteskript_agent.img_gen.json_processor import NewsDataProcessor
-from byteskript_agent.telegram_sender import TelegramSender
+from byteskript_agent.telegram_sender import TelegramSender, encode_png
+from byteskript_agent.tools.playwright_tool import close_browser_pool
+from byteskript_agent.tools.serper_tools import aclose_client
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
 
 def save_data_with_metadata(data, filename="data.json"):
     """
@@ -41,24 +49,34 @@ def save_data_with_metadata(data, filename="data.json"):
         # Create the final data structure
         final_data = {"metadata": metadata, "posts": data}
 
-        # Create backup of existing file if it exists
+        # Serialize once; every file below shares these bytes
+        payload = orjson.dumps(final_data, option=orjson.OPT_INDENT_2)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamped_filename = f"data_{timestamp}.json"
+        # Write a fresh file and swap it in: a save in the same second must not
+        # write through the hard link into the previous data.json
+        tmp_filename = f"{timestamped_filename}.tmp"
+        with open(tmp_filename, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_filename, timestamped_filename)
+
+        # The previous file becomes the backup by rename rather than by copy
         if os.path.exists(filename):
             backup_filename = f"{filename}.backup"
-            shutil.copy2(filename, backup_filename)
+            os.replace(filename, backup_filename)
             print(f"Backup created: {backup_filename}")
 
-        # Save the new data
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(final_data, f, indent=2, ensure_ascii=False)
+        # Link the latest data to the timestamped file instead of writing it again
+        try:
+            os.link(timestamped_filename, filename)
+        except OSError:
+            # Filesystems without hard links get a plain copy
+            with open(filename, "wb") as f:
+                f.write(payload)
 
         print(f"Data saved successfully to {filename}")
         print(f"Total posts: {len(data)}")
-
-        # Also save a timestamped version
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        timestamped_filename = f"data_{timestamp}.json"
-        with open(timestamped_filename, "w", encoding="utf-8") as f:
-            json.dump(final_data, f, indent=2, ensure_ascii=False)
         print(f"Timestamped backup saved: {timestamped_filename}")
 
         return True
@@ -68,36 +86,40 @@ def save_data_with_metadata(data, filename="data.json"):
         return False
 
 
+# Keys every formatted post must carry for the chat to be considered finished
+_REQUIRED_POST_KEYS = frozenset(("title", "caption", "source", "url", "thumbnail_url"))
+# One scan that every final message matches: the termination signal or a key
+# every post must carry. Anything else skips the parse path entirely.
+_FAST_GATE = re.compile(r'TERMINATE\s*$|"thumbnail_url"')
+# The post array inside a ```json fence, captured in the same scan
+_JSON_FENCE = re.compile(r"```json\s*(\[.*?\])\s*```", re.DOTALL)
+
+
 def is_termination_msg(message):
     """Check if a message indicates termination."""
     content = message.get("content", "")
-    if content is None:
+    if content is None or not _FAST_GATE.search(content):
         return False
 
     if content.rstrip().endswith("TERMINATE"):
         return True
 
     # Handle cases where the message content might be a code block with JSON
-    if "```json" in content:
-        # Extract content within the json code block
-        start = content.find("```json") + len("```json")
-        end = content.rfind("```")
-        if end > start:
-            content = content[start:end].strip()
-    # sometimes the LLM just returns raw JSON
-    elif content.strip().startswith("[") and content.strip().endswith("]"):
-        content = content.strip()
+    match = _JSON_FENCE.search(content)
+    if match:
+        content = match.group(1)
+    # sometimes the LLM just returns raw JSON; orjson skips the surrounding
+    # whitespace itself, so only the first and last characters are checked
+    elif not (content.lstrip()[:1] == "[" and content.rstrip()[-1:] == "]"):
+        return False
 
     try:
         # Attempt to parse the content as JSON
-        data = json.loads(content)
+        data = orjson.loads(content)
         # Check if it's a list (JSON array) of objects
         if isinstance(data, list) and data and isinstance(data[0], dict):
             # Check if the first item has the expected keys
-            if all(
-                k in data[0]
-                for k in ["title", "caption", "source", "url", "thumbnail_url"]
-            ):
+            if _REQUIRED_POST_KEYS.issubset(data[0]):
                 # Save data with improved mechanism
                 success = save_data_with_metadata(data)
                 if success:
@@ -106,7 +128,7 @@ def is_termination_msg(message):
                     print("❌ Failed to save data, but conversation will terminate.")
                 return True
 
-    except (json.JSONDecodeError, IndexError):
+    except (orjson.JSONDecodeError, IndexError):
         # Not valid JSON or empty list
         pass
 
@@ -118,57 +140,46 @@ telegram_sender = TelegramSender(
 )
 
 
-def run_with_loop(func, *args, **kwargs):
-    loop = asyncio.get_event_loop()
-    if loop.is_running():
-        asyncio.create_task(func(*args, **kwargs))
-    else:
-        loop.run_until_complete(func(*args, **kwargs))
-
-
-def on_one_generated(img: Image.Image, data):
+async def on_one_generated(img: Image.Image, data):
     """
-    On one generation complete, save the images and data.
+    On one generation complete, send the image and its text to Telegram.
     """
     summary = data["summary"]
 
-    img_bytes = BytesIO()
-    img.save(img_bytes, format="PNG")
-    img_bytes.seek(0)
-
-    run_with_loop(
-        telegram_sender.app.bot.send_photo,
-        chat_id=telegram_sender.chat_id,
-        photo=img_bytes,
-    )
-
-    run_with_loop(
-        telegram_sender.app.bot.send_message,
-        chat_id=telegram_sender.chat_id,
-        text=summary,
-        parse_mode="Markdown",
+    img_bytes = await encode_png(img)
+
+    # Awaited by the processor, so nothing is left running when it returns
+    await asyncio.gather(
+        telegram_sender.app.bot.send_photo(
+            chat_id=telegram_sender.chat_id,
+            photo=img_bytes,
+        ),
+        telegram_sender.app.bot.send_message(
+            chat_id=telegram_sender.chat_id,
+            text=summary,
+            parse_mode="Markdown",
+        ),
+        telegram_sender.app.bot.send_message(
+            chat_id=telegram_sender.chat_id,
+            text=data["url"],
+        ),
     )
 
-    run_with_loop(
-        telegram_sender.app.bot.send_message,
-        chat_id=telegram_sender.chat_id,
-        text=data["url"],
-    )
 
-
-def run():
-    """
-    Run the autogen crew to generate tech news reports.
+@lru_cache(maxsize=1)
+def _build_chat(agents):
     """
-    current_date = datetime.now().strftime("%Y-%m-%d")
+    Build the user proxy, group chat and its manager around the given agents.
 
-    # Create agents with current date
+    create_agents_with_date returns the same agents on every call, so these
+    are constructed once per process and reused by later runs.
+    """
     (
         search_query_agent,
         content_scraper_agent,
         credibility_checker_agent,
         formatter_agent,
-    ) = create_agents_with_date(current_date)
+    ) = agents
 
     # Create a UserProxyAgent
     user_proxy = autogen.UserProxyAgent(
@@ -216,6 +227,21 @@ def run():
         llm_config=group_chat_llm_config,
     )
 
+    return user_proxy, groupchat, manager
+
+
+def run():
+    """
+    Run the autogen crew to generate tech news reports.
+    """
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    user_proxy, groupchat, manager = _build_chat(create_agents_with_date(current_date))
+    # The chat objects are reused across runs; start each run with no history
+    groupchat.reset()
+    user_proxy.reset()
+    manager.reset()
+
     initial_prompt = f"""
     Generate a ByteSkript-style tech news report featuring specific, high-quality updates from the past 24 hours only.
 
@@ -247,18 +273,30 @@ def run():
     Ensure summary is concise and hook-style (e.g., ~2 lines max).
     """
 
-    user_proxy.initiate_chat(
-        manager,
-        message=initial_prompt,
-        verbose=False,  # Reduce verbose output
-    )
+    async def chat():
+        try:
+            await user_proxy.a_initiate_chat(
+                manager,
+                message=initial_prompt,
+                verbose=False,  # Reduce verbose output
+            )
+        finally:
+            # The shared search session and browser belong to this loop; close
+            # them before asyncio.run tears the loop down
+            await aclose_client()
+            await close_browser_pool()
+
+    # The async chat runs the tool calls of a single turn concurrently
+    asyncio.run(chat())
 
     processor = NewsDataProcessor(ImageGenerator(), on_one_generated)
 
-    with open("data_20250717_032727.json", "r") as f:
-        data = json.load(f)
-        data = json.loads(data)
-    images = processor.process_data(data)
+    with open("data_20250717_032727.json", "rb") as f:
+        data = orjson.loads(f.read())
+    # Files from the old save tool hold the agent's JSON text as one string
+    if isinstance(data, str):
+        data = orjson.loads(data)
+    images = asyncio.run(processor.process_data(data))
     print(f"Generated {len(images)} images")
 
 
@@ -0,0 +1,67 @@
+import time
+
+import httpx
+import pytest
+
+from byteskript_agent.llm_providers import (
+    LLMConfig,
+    LLMGenerationError,
+    LLMProvider,
+    LLM_MAX_ATTEMPTS,
+    _is_transient,
+    retry_transient,
+)
+
+
+class FlakyProvider(LLMProvider):
+    """Raises the queued errors in order, then answers."""
+
+    def __init__(self, errors):
+        super().__init__(LLMConfig(api_key="test", model="test"))
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _initialize_client(self):
+        pass
+
+    @retry_transient
+    def generate(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+
+def test_httpx_transport_errors_are_transient():
+    request = httpx.Request("POST", "https://example.com")
+    assert _is_transient(httpx.ReadTimeout("timed out", request=request))
+    assert _is_transient(httpx.ConnectError("refused", request=request))
+
+
+def test_read_timeout_is_retried():
+    request = httpx.Request("POST", "https://example.com")
+    provider = FlakyProvider([httpx.ReadTimeout("timed out", request=request)])
+    assert provider.generate("hi") == "ok"
+    assert provider.calls == 2
+
+
+def test_exhausted_read_timeouts_raise_generation_error():
+    request = httpx.Request("POST", "https://example.com")
+    provider = FlakyProvider(
+        [httpx.ReadTimeout("timed out", request=request)] * LLM_MAX_ATTEMPTS
+    )
+    with pytest.raises(LLMGenerationError):
+        provider.generate("hi")
+    assert provider.calls == LLM_MAX_ATTEMPTS
+
+
+def test_non_transient_errors_propagate_unchanged():
+    provider = FlakyProvider([ValueError("bad request")])
+    with pytest.raises(ValueError):
+        provider.generate("hi")
+    assert provider.calls == 1